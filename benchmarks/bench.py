@@ -0,0 +1,190 @@
+# benchmarks/bench.py
+# 盤面処理と描画の重い部分を盤面サイズごとに測るベンチマーク
+#
+#   python benchmarks/bench.py                        結果 (JSON) を表示
+#   python benchmarks/bench.py --save base.json       結果を保存
+#   python benchmarks/bench.py --compare base.json    保存した結果より threshold 以上遅ければ終了コード 1
+#
+# 時間は 1 回の操作あたりの秒数 (repeat 回のうち最小)
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import logic
+import bitboard
+import headless_tk
+
+BACKENDS = {"logic": logic, "bitboard": bitboard}
+SIZES = [9, 16, 50, 200, 1000, 2000]
+DENSITY = 0.15
+
+class Skip(Exception):
+    """ この環境では測れないケース """
+
+def best_of(repeat, setup, run, ops=1):
+    """ setup() の戻り値を run に渡して repeat 回測り、1 操作あたりの最小時間を返す """
+    best = float("inf")
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - start)
+    return best / ops
+
+def _mines(size):
+    return int(size * size * DENSITY)
+
+# --- ケース (どれも (backend, size, repeat) を受け取って秒数を返す) ---
+
+def bench_initialize(mod, size, repeat):
+    rng = random.Random(size)
+    return best_of(repeat, lambda: rng.randrange(1 << 32),
+                   lambda seed: mod.initialize_board(size, _mines(size), size // 2, size // 2, seed))
+
+def bench_open_cascade(mod, size, repeat):
+    # 地雷が無いので 1 回で盤面全体が開く (最悪の連鎖)
+    return best_of(repeat, lambda: mod.initialize_board(size, 0, 0, 0, 0),
+                   lambda board: board.open_cell(0, 0))
+
+def bench_open_single(mod, size, repeat):
+    # 数字のマス (連鎖しない) をいくつも開いて平均する
+    def setup():
+        board = mod.initialize_board(size, _mines(size), 0, 0, size)
+        rng = random.Random(size)
+        cells = set()
+        for _ in range(20 * min(size * size, 1000)):
+            r, col = rng.randrange(size), rng.randrange(size)
+            if not board.is_mine(r, col) and _count(board, r, col):
+                cells.add((r, col))
+            if len(cells) >= 1000: break
+        return board, sorted(cells)
+
+    def run(arg):
+        board, cells = arg
+        for r, col in cells: board.open_cell(r, col)
+
+    board, cells = setup()
+    if not cells: raise Skip("no numbered cells")
+    return best_of(repeat, setup, run, len(cells))
+
+def _count(board, r, col):
+    return sum(board.is_mine(r + dr, col + dc)
+               for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+               if (dr or dc) and 0 <= r + dr < board.size and 0 <= col + dc < board.size)
+
+def bench_toggle_flag(mod, size, repeat):
+    rng = random.Random(size)
+    cells = [(rng.randrange(size), rng.randrange(size)) for _ in range(1000)]
+    def run(board):
+        for r, col in cells: board.toggle_flag(r, col)
+    return best_of(repeat, lambda: mod.initialize_board(size, _mines(size), 0, 0, 1), run, len(cells))
+
+def bench_check_win(mod, size, repeat):
+    def run(board):
+        for _ in range(1000): board.check_win()
+    def setup():
+        board = mod.initialize_board(size, _mines(size), 0, 0, 1)
+        board.open_cell(0, 0)
+        return board
+    return best_of(repeat, setup, run, 1000)
+
+def bench_refresh_board(mod, size, repeat):
+    # 画面の有無や Tk の速さに左右されないよう、Tk は何もしない代わり (headless_tk) にして
+    # view と graphics の Python 側の処理だけを測る
+    if mod is not logic: raise Skip("view needs logic.Board")
+    headless_tk.install()
+    import view
+    game_view = view.MinesweeperView(size, _mines(size))
+    blank = logic.initialize_board(size, 0, 0, 0, 0)
+    try:
+        def setup():
+            # 画面を全部未オープンに戻しておく。戻さないと、描いたものを覚えている
+            # キャッシュ (view.shown, TileRenderer.shown) のせいで 2 回目以降は何も描かない
+            game_view.refresh_board(blank)
+            board = logic.initialize_board(size, 0, 0, 0, 0)
+            board.open_cell(0, 0)
+            return board
+        return best_of(repeat, setup, game_view.refresh_board)
+    finally:
+        game_view.close()
+
+CASES = {
+    "initialize_board": bench_initialize,
+    "open_cell.cascade": bench_open_cascade,
+    "open_cell.single": bench_open_single,
+    "toggle_flag": bench_toggle_flag,
+    "check_win": bench_check_win,
+    "refresh_board": bench_refresh_board,
+}
+
+def run(backend="logic", sizes=SIZES, cases=None, repeat=5, log=sys.stderr):
+    """ ベンチマークを実行し、{"ケース[サイズ]": 秒} を含む dict を返す """
+    mod = BACKENDS[backend]
+    results, skipped = {}, {}
+    for name in cases or CASES:
+        for size in sizes:
+            key = f"{name}[{size}]"
+            try:
+                results[key] = CASES[name](mod, size, repeat)
+            except Skip as e:
+                skipped[key] = str(e)
+                continue
+            if log: print(f"{key:28s} {results[key] * 1e3:12.4f} ms", file=log)
+    return {
+        "backend": backend,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+
+def compare(current, baseline, threshold):
+    """ baseline より (1 + threshold) 倍以上遅くなったケースを [(名前, 前, 今), ...] で返す """
+    regressions = []
+    for key, seconds in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is not None and seconds > base * (1 + threshold):
+            regressions.append((key, base, seconds))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Minesweeper logic and view hot paths")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="logic")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown in --compare (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.backend, args.sizes, args.cases, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for key, base, seconds in regressions:
+            print(f"REGRESSION {key}: {base * 1e3:.4f} ms -> {seconds * 1e3:.4f} ms "
+                  f"({seconds / base - 1:+.0%})", file=sys.stderr)
+        if regressions: return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# benchmarks/headless_tk.py
+# 画面の無い環境で view を測るための、何もしない tkinter の代わり
+#
+# graphics は import した時点で tk.Tk() を作るので、その前に install() で
+# sys.modules["tkinter"] をこれに差し替える。キャンバスへの描画やウィンドウの更新は
+# 何もせず数えるだけなので、ベンチマークには view と graphics の Python 側の
+# 処理 (どのマスを描き直すか、Tk に何回頼むか) だけが入る。
+import sys
+
+calls = {"items": 0, "config": 0, "update": 0}   # Tk に頼んだ回数 (確認用)
+
+class TclError(Exception):
+    pass
+
+class Misc:
+    def __init__(self, master=None, **options):
+        self.master = master
+
+    def update(self):
+        calls["update"] += 1
+
+    def update_idletasks(self):
+        calls["update"] += 1
+
+    def _noop(self, *args, **options):
+        pass
+
+    withdraw = protocol = title = resizable = lift = destroy = quit = mainloop = _noop
+    bind = bind_all = focus_set = pack = after_cancel = wait_variable = _noop
+
+    def after(self, ms, func=None, *args):
+        return "after"
+
+    after_idle = after
+
+class Tk(Misc):
+    pass
+
+class Toplevel(Misc):
+    pass
+
+class Frame(Misc):
+    pass
+
+class Entry(Misc):
+    pass
+
+class Canvas(Misc):
+    def __init__(self, master=None, **options):
+        Misc.__init__(self, master)
+        self._last_id = 0
+
+    def _create(self, *args, **options):
+        calls["items"] += 1
+        self._last_id += 1
+        return self._last_id
+
+    create_rectangle = create_oval = create_line = create_polygon = _create
+    create_text = create_image = create_window = _create
+
+    def itemconfig(self, *args, **options):
+        calls["config"] += 1
+
+    itemconfigure = config = configure = itemconfig
+    delete = move = coords = Misc._noop
+
+class StringVar:
+    def __init__(self, master=None, value=""):
+        self.value = value
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+class PhotoImage:
+    _count = 0
+
+    def __init__(self, master=None, width=0, height=0, **options):
+        PhotoImage._count += 1
+        self.name = f"image{PhotoImage._count}"
+        self._width, self._height = width, height
+        self.tk = self   # graphics.Image は img.tk.call(...) で copy を呼ぶ
+
+    def __str__(self):
+        return self.name
+
+    def call(self, *args):
+        calls["config"] += 1
+
+    def put(self, *args, **options):
+        calls["config"] += 1
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def copy(self):
+        return PhotoImage(width=self._width, height=self._height)
+
+def install():
+    """ この module を tkinter として import されるようにする (graphics より先に呼ぶ) """
+    if "graphics" in sys.modules and sys.modules.get("tkinter") is not sys.modules[__name__]:
+        raise RuntimeError("graphics was already imported with the real tkinter")
+    sys.modules["tkinter"] = sys.modules[__name__]
@@ -0,0 +1,223 @@
+# bitboard.py
+# 盤面の各層を 1 つの巨大な int (1 マス 1 ビット) で持つ実装
+#
+#   ビット k = r * width + col (width = size + 1)
+#   各行の右端に 1 列分の番兵 (常に 0) を置くので、左右にずらしたビットが
+#   隣の行に回り込まない。上下は width だけずらせばよい。
+#
+# 周りの地雷数・連鎖オープン・勝利判定は、1 マスずつではなく int 全体の
+# シフトと AND/OR で一度に計算する (1 回の演算で 64 マス分ずつ進む)
+from array import array
+
+import logic
+import consts as c
+
+# 表示の値 + 4 (0..12) を 1 バイトずつ並べたものから、表示の値 (符号付き) に直す表
+_FROM_CODE = bytes((v + c.BORDER) & 0xff for v in range(256))
+_BIT_BYTE = bytes.maketrans(b"01", b"\0\1")
+
+class BitBoard:
+    """ 地雷・開いたマス・旗を int のビット列で持つ盤面 (logic.Board と同じ操作を持つ)
+
+    周りの地雷数は 4 枚のビット平面 (count[0] が 1 の位 ... count[3] が 8 の位) で持つ。
+    int は書き換えられないので、copy() は層を指す参照を写すだけで済む。
+    """
+    __slots__ = ("size", "num_mines", "width", "valid", "mines", "count", "zero",
+                 "revealed", "flagged", "flags")
+
+    def __init__(self, size, num_mines):
+        self.size = size
+        self.num_mines = num_mines
+        self.width = w = size + 1
+        row = (1 << size) - 1
+        # 番兵以外のマス全部。行のパターンを倍々に並べて作る
+        valid, n = row, 1
+        while n < size:
+            valid |= valid << (n * w)
+            n *= 2
+        self.valid = valid & ((1 << size * w) - 1)
+        self.mines = 0
+        self.count = (0, 0, 0, 0)
+        self.zero = self.valid
+        self.revealed = 0
+        self.flagged = 0
+        self.flags = 0
+
+    def copy(self):
+        other = BitBoard.__new__(BitBoard)
+        for name in BitBoard.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def index(self, r, col):
+        return r * self.width + col
+
+    def coords(self, k):
+        return divmod(k, self.width)
+
+    # --- ビット演算の部品 ---
+
+    def _dilate(self, x):
+        """ x の各ビットを周り 8 マスに広げる (番兵と盤面の外は valid で落とす) """
+        w = self.width
+        x |= x << 1 | x >> 1
+        return (x | x << w | x >> w) & self.valid
+
+    def _neighbors(self, x):
+        # 8 方向にずらした層 (自分自身は含まない)
+        w = self.width
+        for d in (1, w - 1, w, w + 1):
+            yield (x << d) & self.valid
+            yield (x >> d) & self.valid
+
+    def _fill(self, region, passable):
+        """ region から passable の中を 8 方向につながるところまで広げる
+
+        行方向と列方向はシフト幅を倍々にする塗りつぶし (Kogge-Stone) で一度に伸ばし、
+        曲がり角や斜めの分は 1 マスずつ広げる。これを変化が無くなるまで繰り返す。
+        """
+        w = self.width
+        prev = None
+        while region != prev:
+            prev = region
+            for d in (1, w):
+                for sign in (1, -1):
+                    g, p, n = region, passable, d
+                    while n < (self.size + 1) * d:
+                        if sign > 0:
+                            g |= p & (g << n)
+                            p &= p << n
+                        else:
+                            g |= p & (g >> n)
+                            p &= p >> n
+                        n *= 2
+                    region = g
+            region |= self._dilate(region) & passable
+        return region
+
+    # --- logic.Board と同じ操作 ---
+
+    def place_mines(self, mines):
+        """ 番兵なしの位置 (r * size + col) のリストで地雷を置き、周りの地雷数を数える """
+        size, w = self.size, self.width
+        bits = bytearray((size * w + 7) // 8)
+        for k in mines:
+            b = k // size * w + k % size
+            bits[b >> 3] |= 1 << (b & 7)
+        self.mines = int.from_bytes(bits, "little")
+
+        # 8 枚の層をビットごとの足し算 (半加算器の連鎖) で 4 ビットの数にする
+        b0 = b1 = b2 = b3 = 0
+        for x in self._neighbors(self.mines):
+            c0 = b0 & x; b0 ^= x
+            c1 = b1 & c0; b1 ^= c0
+            c2 = b2 & c1; b2 ^= c1
+            b3 |= c2
+        self.count = (b0, b1, b2, b3)
+        self.zero = self.valid & ~(self.mines | b0 | b1 | b2 | b3)
+
+    def _value(self, k):
+        b0, b1, b2, b3 = self.count
+        return (b0 >> k & 1) | (b1 >> k & 1) << 1 | (b2 >> k & 1) << 2 | (b3 >> k & 1) << 3
+
+    def get(self, r, col):
+        """ 1 マスの表示の値 (まとめて見るなら to_display の方が速い) """
+        k = r * self.width + col
+        if self.flagged >> k & 1: return c.FLAGGED
+        if not self.revealed >> k & 1: return c.UNOPENED
+        if self.mines >> k & 1: return c.MINE
+        return self._value(k)
+
+    def is_mine(self, r, col):
+        return bool(self.mines >> (r * self.width + col) & 1)
+
+    def mine_indices(self):
+        return _bits(self.mines)
+
+    def open_cell(self, r, col, revealed=None):
+        """ マスを開く。地雷なら "GAME_OVER" を返す
+
+        revealed にリストを渡すと、新しく開いたマスのビットの番号を追加していく。
+        """
+        if not (0 <= r < self.size and 0 <= col < self.size): return
+        bit = 1 << r * self.width + col
+        if (self.revealed | self.flagged) & bit: return
+        if self.mines & bit:
+            self.revealed |= bit
+            if revealed is not None: revealed.append(r * self.width + col)
+            return "GAME_OVER"
+
+        new = bit
+        if self.zero & bit:
+            # 0 の領域を広げ、その周りの数字まで開く (旗のマスは開かない)
+            closed = self.valid & ~(self.revealed | self.flagged)
+            region = self._fill(bit, self.zero & closed)
+            new = (region | self._dilate(region)) & closed
+        self.revealed |= new
+        if revealed is not None: revealed.extend(_bits(new))
+
+    def toggle_flag(self, r, col):
+        bit = 1 << r * self.width + col
+        if self.revealed & bit: return
+        self.flagged ^= bit
+        self.flags += 1 if self.flagged & bit else -1
+
+    def reveal_mines(self, revealed=None):
+        """ ゲームオーバー時に全地雷を表示する """
+        new = self.mines & ~self.revealed
+        if revealed is not None: revealed.extend(_bits(new))
+        self.flags -= (self.flagged & new).bit_count()
+        self.flagged &= ~new
+        self.revealed |= new
+
+    @property
+    def opened(self):
+        return (self.revealed & ~self.mines).bit_count()
+
+    def remaining_mines(self):
+        return self.num_mines - self.flags
+
+    def check_win(self):
+        safe = self.valid & ~self.mines
+        return self.revealed & safe == safe
+
+    def to_display(self):
+        """ 番兵なしで行優先に並べた表示状態 (array("b")) を作る """
+        n = self.size * self.width
+        # ビット k を k 番目のバイトに広げた int を作り、層ごとにずらして OR する
+        codes = 0
+        for j, plane in enumerate(self.count):
+            codes |= _spread(plane & ~self.mines, n) << j
+        ones = _spread(self.valid, n)
+        codes += ones * -c.BORDER
+        # 未オープン・旗・開いた地雷のマスはバイトごと 0xff のマスクで差し替える
+        hidden = _spread(self.valid & ~self.revealed, n) * 0xff
+        flag = _spread(self.flagged, n) * 0xff
+        mine = _spread(self.mines & self.revealed, n) * 0xff
+        codes = (codes & ~(hidden | mine)
+                 | ones * (c.MINE - c.BORDER) & mine
+                 | ones * (c.UNOPENED - c.BORDER) & hidden & ~flag
+                 | ones * (c.FLAGGED - c.BORDER) & flag)
+        data = codes.to_bytes(n, "little").translate(_FROM_CODE)
+        w, size = self.width, self.size
+        return array("b", b"".join(data[r * w:r * w + size] for r in range(size)))
+
+def _spread(x, n):
+    # ビット k (0 <= k < n) を k 番目のバイト (0 か 1) にした int
+    return int.from_bytes(format(x, "b").zfill(n).encode().translate(_BIT_BYTE), "big")
+
+def _bits(x):
+    """ 立っているビットの番号のリスト (小さい順) """
+    s = format(x, "b")[::-1]
+    out = []
+    k = s.find("1")
+    while k >= 0:
+        out.append(k)
+        k = s.find("1", k + 1)
+    return out
+
+def initialize_board(size, num_mines, y, x, seed=None):
+    """ logic.initialize_board と同じ盤面 (同じ seed なら同じ地雷の位置) を BitBoard で作る """
+    board = BitBoard(size, num_mines)
+    board.place_mines(logic.sample_mines(size, num_mines, y, x, seed))
+    return board
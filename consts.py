@@ -3,11 +3,23 @@
 CELL_SIZE = 30
 HEADER_HEIGHT = 50     # ★追加: 上部のメッセージエリアの高さ
 FONT_SIZE_HEADER = 24  # ★追加: 結果表示用の大きなフォントサイズ
+TILE_MIN_SIZE = 32     # この大きさ以上の盤面は 1 枚の画像に描く (tiles.TileRenderer)
+VIEWPORT_CELLS = 30    # 画面に一度に出すマスの数 (縦横)。これより大きい盤面はスクロールする
 
 # --- 状態定数 ---
 MINE = -1
 UNOPENED = -2
 FLAGGED = -3 
+BORDER = -4    # 盤面の外周 (番兵) を表す内部用の値
+
+# --- 難易度 (盤面サイズ, 地雷数) ---
+DIFFICULTIES = [(9, 10), (16, 40), (20, 70)]
+NO_GUESS = False       # スタート画面の「推測なしで解ける盤面」の初期値
+
+# --- ゲームの状態 ---
+PLAYING = "PLAYING"
+WON = "WON"
+LOST = "LOST"
 
 # --- 色定義 ---
 COLOR_UNOPENED = "lightgray"
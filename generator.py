@@ -0,0 +1,122 @@
+# generator.py
+# 推測なし (no-guess) の盤面生成: ソルバーだけで最後まで解ける盤面が出るまで作り直す
+#
+#   python generator.py --bench            # 難易度ごとの生成速度 (boards/sec)
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import logic
+from solver import Solver
+import consts as c
+
+def is_solvable(board, r, col):
+    """ (r, col) を開いたあと、推測せずに全ての安全マスを開けるか (board は書き換わる) """
+    changed = []
+    if board.open_cell(r, col, changed) == "GAME_OVER": return False
+    solver = Solver(board)
+    solver.update(changed)
+    while solver.safe:
+        changed = []
+        board.open_cell(*board.coords(solver.safe.pop()), changed)
+        solver.update(changed)
+    return board.check_win()
+
+def candidate_seed(seed, k):
+    """ k 番目の候補盤面の seed (seed と k だけで決まる) """
+    return seed * 1000003 + k
+
+def _search(size, num_mines, r, col, seed, first, count):
+    """ first 番目から count 個の候補を順に試し、最初に解けた番号を返す (無ければ None) """
+    for k in range(first, first + count):
+        board = logic.initialize_board(size, num_mines, r, col, candidate_seed(seed, k))
+        if is_solvable(board, r, col):
+            return k
+    return None
+
+def generate_no_guess(size, num_mines, r, col, seed=None, jobs=1, pool=None,
+                      batch=8, max_candidates=100000):
+    """ 最初のクリック (r, col) から推測なしで解ける盤面を作り、(盤面, 盤面の seed) を返す
+
+    候補は seed から決まる順番に試し、jobs > 1 (または pool を渡したとき) は
+    プロセスプールで jobs 区間ずつ並列に調べる。どの並列度でも「解ける候補のうち最も番号が
+    小さいもの」を返すので、同じ seed なら同じ盤面になる。
+    """
+    if seed is None:
+        seed = random.randrange(1 << 32)
+
+    if pool is None and jobs <= 1:
+        k = _search(size, num_mines, r, col, seed, 0, max_candidates)
+    else:
+        own_pool = pool is None
+        if own_pool:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+        workers = max(1, jobs)
+        try:
+            k = None
+            first = 0
+            while k is None and first < max_candidates:
+                # 1 ラウンドで workers 個の区間を同時に調べる
+                futures = []
+                for _ in range(workers):
+                    futures.append(pool.submit(_search, size, num_mines, r, col, seed, first, batch))
+                    first += batch
+                found = [f.result() for f in futures]
+                found = [x for x in found if x is not None]
+                if found:
+                    k = min(found)
+        finally:
+            if own_pool:
+                pool.shutdown()
+
+    if k is None:
+        raise RuntimeError(f"no guess-free {size}x{size} board with {num_mines} mines found "
+                           f"in {max_candidates} candidates")
+    board_seed = candidate_seed(seed, k)
+    return logic.initialize_board(size, num_mines, r, col, board_seed), board_seed
+
+def benchmark(duration=3.0, jobs=1):
+    """ 難易度ごとに duration 秒間生成し続け、1 秒あたりの盤面数を返す """
+    results = {}
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        for size, num_mines in c.DIFFICULTIES:
+            rng = random.Random(size)
+            boards = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                r, col = rng.randrange(size), rng.randrange(size)
+                generate_no_guess(size, num_mines, r, col, rng.randrange(1 << 32), jobs, pool)
+                boards += 1
+            results[(size, num_mines)] = boards / (time.perf_counter() - start)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="No-guess Minesweeper board generator")
+    parser.add_argument("--bench", action="store_true", help="measure boards/sec for each difficulty")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per difficulty in --bench")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        for (size, num_mines), rate in benchmark(args.duration, args.jobs).items():
+            print(f"{size}x{size}, {num_mines} mines: {rate:.1f} boards/sec (jobs={args.jobs})")
+        return
+
+    center = args.size // 2
+    board, board_seed = generate_no_guess(args.size, args.mines, center, center, args.seed, args.jobs)
+    print(f"seed {board_seed}")
+    for r in range(board.size):
+        print("".join("*" if board.is_mine(r, col) else str(board.cells[board.index(r, col)] or ".")
+                      for col in range(board.size)))
+
+if __name__ == "__main__":
+    main()
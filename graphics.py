@@ -161,6 +161,7 @@ __version__ = "5.0"
 #     Added Entry boxes.
 
 import time, os, sys
+from contextlib import contextmanager
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
@@ -227,6 +228,8 @@ class GraphWin(tk.Canvas):
         self.width = int(width)
         self.autoflush = autoflush
         self._mouseCallback = None
+        self._keyCallback = None
+        self._inMainloop = False
         self.trans = None
         self.closed = False
         master.lift()
@@ -250,6 +253,8 @@ class GraphWin(tk.Canvas):
 
     def _onKey(self, evnt):
         self.lastKey = evnt.keysym
+        if self._keyCallback:
+            self._keyCallback(evnt.keysym)
 
 
     def setBackground(self, color):
@@ -270,6 +275,8 @@ class GraphWin(tk.Canvas):
         if self.closed: return
         self.closed = True
         self.master.destroy()
+        if self._inMainloop:
+            _root.quit()
         self.__autoflush()
 
 
@@ -304,6 +311,20 @@ class GraphWin(tk.Canvas):
         """Update drawing to the window"""
         self.__checkOpen()
         self.update_idletasks()
+
+    @contextmanager
+    def batch(self):
+        """Suspend autoflush for the duration of a with-block, so that
+        the drawing operations inside it are flushed to the window in
+        a single update when the block exits. Batches may be nested."""
+        autoflush = self.autoflush
+        self.autoflush = False
+        try:
+            yield self
+        finally:
+            self.autoflush = autoflush
+            if autoflush and not self.closed:
+                _root.update()
         
     def getMouse(self):
         """Wait for mouse click and return Point object representing
@@ -378,13 +399,35 @@ class GraphWin(tk.Canvas):
             return x,y
         
     def setMouseHandler(self, func):
+        """Call func with a Point (in world coordinates) as soon as
+        the window is clicked. Use together with mainloop."""
         self._mouseCallback = func
+
+    def bindMouse(self, event, func):
+        """Call func with a Point (in world coordinates) when the mouse
+        event (e.g. "<Button-2>" or "<Double-Button-1>") happens."""
+        self.bind(event, lambda e: func(Point(*self.toWorld(e.x, e.y))))
+
+    def setKeyHandler(self, func):
+        """Call func with the key name (keysym) as soon as a key is
+        pressed. Use together with mainloop."""
+        self._keyCallback = func
+
+    def mainloop(self, n=0):
+        """Run the Tk event loop, dispatching events to the handlers
+        set with setMouseHandler, until the window is closed."""
+        self.__checkOpen()
+        self._inMainloop = True
+        try:
+            _root.mainloop(n)
+        finally:
+            self._inMainloop = False
         
     def _onClick(self, e):
         self.mouseX = e.x
         self.mouseY = e.y
         if self._mouseCallback:
-            self._mouseCallback(Point(e.x, e.y))
+            self._mouseCallback(Point(*self.toWorld(e.x, e.y)))
 
     def addItem(self, item):
         self.items.append(item)
@@ -943,6 +986,23 @@ class Image(GraphicsObject):
         
         """
         self.img.put("{" + color +"}", (x, y))
+
+    def fillRect(self, x1, y1, x2, y2, color):
+        """Sets every pixel in the rectangle from (x1,y1) up to, but not
+        including, (x2,y2) to the given color in a single Tk call.
+
+        """
+        self.img.put("{" + color + "}", to=(x1, y1, x2, y2))
+
+    def copyFrom(self, other, x, y, region=None):
+        """Copies the pixels of Image other (or only region, given as
+        (x1, y1, x2, y2) in other) into this image with the top-left
+        corner at (x,y). Copying within the same image is allowed as long
+        as the source and destination do not overlap.
+
+        """
+        args = ["-from", *region] if region else []
+        self.img.tk.call(str(self.img), "copy", str(other.img), *args, "-to", x, y)
         
 
     def save(self, filename):
@@ -0,0 +1,180 @@
+# infinite.py
+# 無限に広がる盤面: 世界を chunk_size 四方のチャンクに分け、触れたところだけ作る
+import random
+import zlib
+from array import array
+from collections import OrderedDict
+
+import consts as c
+
+class Chunk:
+    """ 1 チャンク分の表示状態と周りの地雷数 (地雷は MINE) """
+    __slots__ = ("display", "cells", "opened")
+
+    def __init__(self, display, cells):
+        self.display = display
+        self.cells = cells
+        self.opened = sum(1 for v in display if v >= 0)
+
+class InfiniteBoard:
+    """ 座標 (r, col) が任意の整数をとる盤面
+
+    - チャンク (cr, cc) の地雷は (seed, cr, cc) だけから決まるので、いつ作っても同じ
+    - 一度も触れていないチャンクは何も持たない
+    - 開いたり旗を立てたりしたチャンクは最大 max_chunks 個までメモリに置き、
+      溢れたら最も長く使われていないものを圧縮して store へ退避する (LRU)
+    - (0, 0) の周り 3x3 には地雷を置かないので、最初は (0, 0) を開けばよい
+
+    地雷の密度が低いと 0 の領域がどこまでも続くことがあるので、1 回の連鎖で開く
+    マスは limit 個までにしてある。開ききれなかった分は pending に残り、
+    expand() を呼ぶと続きを開く。
+    """
+
+    def __init__(self, seed=None, density=0.15, chunk_size=32, max_chunks=256, limit=100000):
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.density = density
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.limit = limit
+        self.chunks = OrderedDict()   # (cr, cc) -> Chunk (使った順)
+        self.store = {}               # (cr, cc) -> 圧縮した表示状態
+        self.mine_cache = OrderedDict()   # (cr, cc) -> チャンク内の地雷の位置の集合
+        self.pending = []             # まだ周りを開いていない 0 のマス
+        self.opened = 0
+        self.flags = 0
+
+    # --- チャンクの生成と退避 ---
+
+    def chunk_mines(self, cr, cc):
+        """ チャンク (cr, cc) の地雷の位置 (チャンク内の r * chunk_size + col) """
+        key = (cr, cc)
+        mines = self.mine_cache.get(key)
+        if mines is not None:
+            self.mine_cache.move_to_end(key)
+            return mines
+        cs = self.chunk_size
+        rng = random.Random(f"{self.seed}:{cr}:{cc}")
+        mines = set(rng.sample(range(cs * cs), round(self.density * cs * cs)))
+        # 原点の周りは安全地帯
+        for r in (-1, 0, 1):
+            for col in (-1, 0, 1):
+                if (r // cs, col // cs) == key:
+                    mines.discard(r % cs * cs + col % cs)
+        mines = frozenset(mines)
+        self.mine_cache[key] = mines
+        if len(self.mine_cache) > 9 * self.max_chunks:
+            self.mine_cache.popitem(last=False)
+        return mines
+
+    def _chunk(self, cr, cc):
+        key = (cr, cc)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        cs = self.chunk_size
+        # 周り 8 チャンクの地雷も使って、チャンク内の各マスの周りの地雷数を数える
+        cells = array("b", bytes(cs * cs))
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for m in self.chunk_mines(cr + dr, cc + dc):
+                    mr, mc = divmod(m, cs)
+                    mr += dr * cs
+                    mc += dc * cs
+                    for r in range(max(mr - 1, 0), min(mr + 2, cs)):
+                        for col in range(max(mc - 1, 0), min(mc + 2, cs)):
+                            cells[r * cs + col] += 1
+        for m in self.chunk_mines(cr, cc):
+            cells[m] = c.MINE
+
+        data = self.store.pop(key, None)
+        if data is not None:
+            display = array("b", zlib.decompress(data))
+        else:
+            display = array("b", [c.UNOPENED]) * (cs * cs)
+        chunk = self.chunks[key] = Chunk(display, cells)
+        return chunk
+
+    def _evict(self):
+        # 操作の途中で退避すると手元のチャンクの変更が失われるので、操作の最後に呼ぶ
+        while len(self.chunks) > self.max_chunks:
+            key, chunk = self.chunks.popitem(last=False)
+            self.store[key] = zlib.compress(chunk.display.tobytes())
+
+    def _locate(self, r, col):
+        cs = self.chunk_size
+        return self._chunk(r // cs, col // cs), r % cs * cs + col % cs
+
+    # --- logic.Board と同じ操作 ---
+
+    def get(self, r, col):
+        cs = self.chunk_size
+        key = (r // cs, col // cs)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if key not in self.store: return c.UNOPENED
+            chunk = self._chunk(*key)
+            self._evict()
+        return chunk.display[r % cs * cs + col % cs]
+
+    def is_mine(self, r, col):
+        cs = self.chunk_size
+        return r % cs * cs + col % cs in self.chunk_mines(r // cs, col // cs)
+
+    def open_cell(self, r, col, revealed=None):
+        """ マスを開く。地雷なら "GAME_OVER" を返す。revealed には (r, col) を追加する """
+        chunk, i = self._locate(r, col)
+        if chunk.display[i] != c.UNOPENED:
+            self._evict()
+            return
+        v = chunk.cells[i]
+        chunk.display[i] = v
+        if revealed is not None: revealed.append((r, col))
+        if v == c.MINE:
+            self._evict()
+            return "GAME_OVER"
+        chunk.opened += 1
+        self.opened += 1
+        if v == 0:
+            self.pending.append((r, col))
+            self.expand(revealed)
+        self._evict()
+
+    def expand(self, revealed=None, limit=None):
+        """ pending に残っている 0 のマスの周りを、最大 limit 個まで開く """
+        limit = self.limit if limit is None else limit
+        cs = self.chunk_size
+        pending = self.pending
+        UNOPENED = c.UNOPENED
+        count = 0
+        chunk_key = None
+        chunk = None
+        while pending and count < limit:
+            r, col = pending.pop()
+            for nr in (r - 1, r, r + 1):
+                for nc in (col - 1, col, col + 1):
+                    key = (nr // cs, nc // cs)
+                    if key != chunk_key:
+                        chunk_key, chunk = key, self._chunk(*key)
+                    i = nr % cs * cs + nc % cs
+                    if chunk.display[i] != UNOPENED: continue
+                    v = chunk.cells[i]
+                    chunk.display[i] = v
+                    chunk.opened += 1
+                    count += 1
+                    if revealed is not None: revealed.append((nr, nc))
+                    if v == 0: pending.append((nr, nc))
+        self.opened += count
+        self._evict()
+        return count
+
+    def toggle_flag(self, r, col):
+        chunk, i = self._locate(r, col)
+        if chunk.display[i] == c.UNOPENED:
+            chunk.display[i] = c.FLAGGED
+            self.flags += 1
+        elif chunk.display[i] == c.FLAGGED:
+            chunk.display[i] = c.UNOPENED
+            self.flags -= 1
+        self._evict()
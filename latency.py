@@ -0,0 +1,92 @@
+# latency.py
+# 1 クリックごとの処理時間の内訳を測る (環境変数 MINESWEEPER_LATENCY を設定したときだけ)
+#
+#   MINESWEEPER_LATENCY=1               終了時に latency.jsonl へ書き出す
+#   MINESWEEPER_LATENCY=path/to.jsonl   書き出し先を指定
+#
+# 書き出すのは 1 クリック 1 行の JSON と、最後に 1 行の要約 ({"summary": ...})
+import atexit
+import json
+import os
+import sys
+import time
+from collections import deque
+
+ENV = "MINESWEEPER_LATENCY"
+# wait: 前の処理が終わってからクリックが届くまで, logic: GameSession の操作 (勝利判定を除く),
+# win_check: Board.check_win, render: 盤面の描き直し, message: 勝敗のメッセージ,
+# flush: Tk への反映
+PHASES = ("wait", "logic", "win_check", "render", "message", "flush")
+
+class LatencyLog:
+    """ 直近 capacity 回分のクリックの内訳 (秒) を持つリングバッファ
+
+    start() でクリックの処理を始め、各段階の終わりに mark(段階) を呼び、
+    finish() で 1 件として記録する。通らなかった段階は 0 になり、
+    同じ段階を何度か mark したときは足し合わせる。
+
+    Tk への反映 (update) の途中で次のクリックが処理されることがあるので、
+    計測中のクリックはスタックに積む。内側のクリックの時間は外側の段階にも含まれる。
+    """
+
+    def __init__(self, capacity=4096):
+        self.samples = deque(maxlen=capacity)
+        self.stack = []      # [(内訳, 直前の段階が終わった時刻), ...]
+        self.last = time.perf_counter()
+
+    def start(self):
+        now = time.perf_counter()
+        self.stack.append(({"wait": now - self.last}, now))
+
+    def mark(self, phase):
+        if not self.stack: return
+        now = time.perf_counter()
+        sample, last = self.stack[-1]
+        sample[phase] = sample.get(phase, 0.0) + now - last
+        self.stack[-1] = (sample, now)
+
+    def finish(self):
+        if not self.stack: return
+        sample, _ = self.stack.pop()
+        for phase in PHASES:
+            sample.setdefault(phase, 0.0)
+        sample["total"] = sum(sample[p] for p in PHASES if p != "wait")
+        self.samples.append(sample)
+        self.last = time.perf_counter()
+
+    def summary(self):
+        """ 段階ごとの p50/p95/p99/max (秒) """
+        result = {"count": len(self.samples)}
+        for phase in PHASES + ("total",):
+            values = sorted(s[phase] for s in self.samples)
+            if not values: continue
+            result[phase] = {f"p{q}": percentile(values, q) for q in (50, 95, 99)}
+            result[phase]["max"] = values[-1]
+        return result
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for sample in self.samples:
+                f.write(json.dumps(sample) + "\n")
+            f.write(json.dumps({"summary": self.summary()}) + "\n")
+
+def percentile(values, q):
+    """ 並べ替え済みの values の q パーセンタイル (最近傍順位) """
+    k = max(0, -(-len(values) * q // 100) - 1)
+    return values[min(k, len(values) - 1)]
+
+def from_env():
+    """ 環境変数で有効にされていれば LatencyLog を作り、終了時に書き出す。無効なら None """
+    value = os.environ.get(ENV)
+    if not value: return None
+    path = "latency.jsonl" if value == "1" else value
+    log = LatencyLog()
+
+    def dump():
+        if not log.samples: return
+        log.dump(path)
+        total = log.summary()["total"]
+        print(f"latency: {len(log.samples)} clicks, p50 {total['p50'] * 1e3:.1f} ms, "
+              f"p99 {total['p99'] * 1e3:.1f} ms -> {path}", file=sys.stderr)
+    atexit.register(dump)
+    return log
@@ -1,67 +1,254 @@
 # logic.py
 import random
+import re
+from array import array
 import consts as c
 
-def initialize_board(size, num_mines,y,x):
-    board = [[0] * size for _ in range(size)]
-    display = [[c.UNOPENED] * size for _ in range(size)]
-    
-    mines_placed = 0
-    directions = [
-        (x-1,y-1),(x,y-1),(x+1,y-1),
-        (x-1,y),(x,y),(x+1,y),
-        (x-1,y+1),(x,y+1),(x+1,y+1)
-    ]
-    for dx, dy in directions:
-        if not (0 <= dx < size and 0 <= dy < size):
-            continue
-        board[dy][dx]=c.FLAGGED
-    
-    while mines_placed < num_mines:
-        r, c_idx = random.randint(0, size - 1), random.randint(0, size - 1)
-        if board[r][c_idx] != c.MINE and board[r][c_idx] != c.FLAGGED:
-            board[r][c_idx] = c.MINE
-            mines_placed += 1
+np = None
+_numpy_checked = False
 
-    for r in range(size):
-        for col in range(size):
-            if board[r][col] == c.MINE:
-                continue
-            count = 0
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    nr, nc = r + dr, col + dc
-                    if (0 <= nr < size) and (0 <= nc < size) and (board[nr][nc] == c.MINE):
-                        count += 1
-            board[r][col] = count
-    return board, display
+def _load_numpy():
+    """ NumPy があれば読み込む (import が重いので、初めて盤面を作るときまで遅らせる) """
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy as np
+        except ImportError:  # NumPy が無い環境では純 Python で数える
+            np = None
+    return np
 
-def open_cell(board, display, r, col, size):
-    if not (0 <= r < size and 0 <= col < size): return
-    if display[r][col] != c.UNOPENED: return
+# 連鎖オープンで、行の中の未オープンのマスの並びと 0 のマスの並びを探す (array をそのまま渡せる)
+_UNOPENED_RUN = re.compile(re.escape(bytes([c.UNOPENED & 0xff])) + b"+")
+_ZERO_RUN = re.compile(b"\\x00+")
+
+class Board:
+    """ 地雷/数字の層 (cells) と表示状態の層 (display) を 1 マス 1 バイトで持つ盤面
+    
+    どちらの層も外周に 1 マス分の番兵を付けた (size+2) x (size+2) の一次元配列で、
+    (r, col) のマスは index(r, col) 番目に入っている。番兵のおかげで隣接マスを
+    見るときに範囲チェックが要らない。
+    開いた安全マスの数 (opened) と旗の数 (flags) は操作のたびに更新するので、
+    勝利判定や残り地雷数は盤面を走査せずに求まる。
+    """
+    __slots__ = ("size", "num_mines", "stride", "cells", "display", "neighbors",
+                 "opened", "flags")
+    
+    def __init__(self, size, num_mines):
+        self.size = size
+        self.num_mines = num_mines
+        self.stride = size + 2
+        area = self.stride * self.stride
+        self.cells = array("b", bytes(area))
+        self.display = array("b", [c.BORDER]) * area
+        interior = array("b", [c.UNOPENED]) * size
+        for r in range(size):
+            start = self.index(r, 0)
+            self.display[start:start + size] = interior
+        # 周囲 8 マスへの添字のずれ
+        s = self.stride
+        self.neighbors = (-s - 1, -s, -s + 1, -1, 1, s - 1, s, s + 1)
+        self.opened = 0
+        self.flags = 0
+    
+    def index(self, r, col):
+        return (r + 1) * self.stride + col + 1
+    
+    def coords(self, i):
+        r, col = divmod(i, self.stride)
+        return r - 1, col - 1
+    
+    def get(self, r, col):
+        return self.display[self.index(r, col)]
+    
+    def is_mine(self, r, col):
+        return self.cells[self.index(r, col)] == c.MINE
+    
+    def mine_indices(self):
+        """ 地雷のあるマスの添字のリスト """
+        cells = self.cells
+        return [i for i in range(len(cells)) if cells[i] == c.MINE]
+    
+    def place_mines(self, mines):
+        """ 添字のリストで与えた位置に地雷を置き、周囲の地雷数を数え直す """
+        if _load_numpy() is not None:
+            self._count_mines_numpy(mines)
+        else:
+            self._count_mines(mines)
     
-    if board[r][col] == c.MINE:
-        display[r][col] = c.MINE
-        return "GAME_OVER"
+    def _count_mines(self, mines):
+        cells = self.cells
+        for i in mines:
+            cells[i] = c.MINE
+        for i in mines:
+            for d in self.neighbors:
+                if cells[i + d] != c.MINE:
+                    cells[i + d] += 1
+        # 番兵に入ったカウントは消しておく
+        s = self.stride
+        last = len(cells) - s
+        cells[0:s] = cells[last:] = array("b", bytes(s))
+        for i in range(s, last, s):
+            cells[i] = cells[i + s - 1] = 0
     
-    display[r][col] = board[r][col]
+    def _count_mines_numpy(self, mines):
+        # 地雷を 1 にした配列を 8 方向にずらして足し合わせ、全マスを一度に数える
+        s, size = self.stride, self.size
+        grid = np.zeros(s * s, dtype=np.int8)
+        grid[np.fromiter(mines, dtype=np.intp, count=len(mines))] = 1
+        grid = grid.reshape(s, s)
+        counts = np.zeros((s, s), dtype=np.int8)
+        inner = counts[1:-1, 1:-1]
+        for dr in (0, 1, 2):
+            for dc in (0, 1, 2):
+                if dr == 1 and dc == 1: continue
+                inner += grid[dr:dr + size, dc:dc + size]
+        counts[grid == 1] = c.MINE
+        self.cells = array("b", counts.tobytes())
     
-    if board[r][col] == 0:
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0: continue
-                open_cell(board, display, r + dr, col + dc, size)
+    def open_cell(self, r, col, revealed=None):
+        """ マスを開く。地雷なら "GAME_OVER" を返す
+        
+        revealed にリストを渡すと、新しく開いたマスの添字を追加していく。
+        """
+        if not (0 <= r < self.size and 0 <= col < self.size): return
+        cells, display = self.cells, self.display
+        i = self.index(r, col)
+        if display[i] != c.UNOPENED: return
+        
+        if cells[i] == c.MINE:
+            display[i] = c.MINE
+            if revealed is not None: revealed.append(i)
+            return "GAME_OVER"
+        
+        if cells[i] != 0:
+            display[i] = cells[i]
+            self.opened += 1
+            if revealed is not None: revealed.append(i)
+            return
+        
+        # 0 のマスはスキャンライン方式で連鎖オープンする
+        # スタックには 0 が連続する区間 [left, right) の添字を積む
+        # (行の両端は番兵なので、区間が行をはみ出すことはない)
+        UNOPENED = c.UNOPENED
+        s = self.stride
+        find_unopened, match_zeros = _UNOPENED_RUN.search, _ZERO_RUN.match
+        stack = [(i, i + 1)]
+        opened = 0
+        while stack:
+            left, right = stack.pop()
+            if display[left] != UNOPENED: continue
+            
+            # 同じ行で、未オープンの 0 が続く範囲まで広げる
+            while cells[left - 1] == 0 and display[left - 1] == UNOPENED:
+                left -= 1
+            while cells[right] == 0 and display[right] == UNOPENED:
+                right += 1
+            display[left:right] = cells[left:right]
+            opened += right - left
+            if revealed is not None: revealed.extend(range(left, right))
+            for x in (left - 1, right):
+                if display[x] == UNOPENED:
+                    display[x] = cells[x]
+                    opened += 1
+                    if revealed is not None: revealed.append(x)
+            
+            # 上下の行: 数字はその場で開き、0 の区間は新しい種として積む
+            # 未オープンの並びと 0 の並びは正規表現で (行をコピーせずに) 探すので、開き済みのマスと
+            # 長い 0 の並びは 1 マスずつ回さない
+            for lo in (left - 1 - s, left - 1 + s):
+                hi = lo + right - left + 2
+                run = find_unopened(display, lo, hi)
+                while run is not None:
+                    x, end = run.span()
+                    while x < end:
+                        if cells[x]:
+                            display[x] = cells[x]
+                            opened += 1
+                            if revealed is not None: revealed.append(x)
+                            x += 1
+                        else:
+                            start, x = x, match_zeros(cells, x, end).end()
+                            stack.append((start, x))
+                    run = find_unopened(display, end, hi)
+        self.opened += opened
+    
+    def chord(self, r, col, revealed=None):
+        """ 開いた数字のマスの周りの旗が数字と同じ数なら、残りの周りのマスをまとめて開く
+        
+        旗の位置が間違っていて地雷を開いたら "GAME_OVER" を返す。
+        """
+        if not (0 <= r < self.size and 0 <= col < self.size): return
+        display = self.display
+        i = self.index(r, col)
+        n = display[i]
+        if n <= 0: return
+        around = [i + d for d in self.neighbors]
+        if [display[j] for j in around].count(c.FLAGGED) != n: return
+        result = None
+        for j in around:
+            # 番兵は UNOPENED ではないので盤面の外は開かない
+            if display[j] == c.UNOPENED and self.open_cell(*self.coords(j), revealed) == "GAME_OVER":
+                result = "GAME_OVER"
+        return result
+    
+    def toggle_flag(self, r, col):
+        i = self.index(r, col)
+        if self.display[i] == c.UNOPENED:
+            self.display[i] = c.FLAGGED
+            self.flags += 1
+        elif self.display[i] == c.FLAGGED:
+            self.display[i] = c.UNOPENED
+            self.flags -= 1
+    
+    def reveal_mines(self, revealed=None):
+        """ ゲームオーバー時に全地雷を表示する """
+        cells, display = self.cells, self.display
+        for i in range(len(cells)):
+            if cells[i] == c.MINE and display[i] != c.MINE:
+                if display[i] == c.FLAGGED: self.flags -= 1
+                display[i] = c.MINE
+                if revealed is not None: revealed.append(i)
+    
+    def remaining_mines(self):
+        return self.num_mines - self.flags
+    
+    def check_win(self):
+        return self.opened == self.size * self.size - self.num_mines
 
-def toggle_flag(display, r, c_idx):
-    if display[r][c_idx] == c.UNOPENED:
-        display[r][c_idx] = c.FLAGGED
-    elif display[r][c_idx] == c.FLAGGED:
-        display[r][c_idx] = c.UNOPENED
+def sample_mines(size, num_mines, y, x, seed=None):
+    """ (y, x) とその周囲 3x3 を避けて選んだ地雷の位置 (番兵なしの r * size + col) のリスト """
+    rng = random.Random(seed)
+    
+    # 最初にクリックしたマスとその周囲には地雷を置かない
+    safe = []
+    for dy in [-1, 0, 1]:
+        for dx in [-1, 0, 1]:
+            if 0 <= y + dy < size and 0 <= x + dx < size:
+                safe.append((y + dy) * size + x + dx)
+    safe.sort()
+    
+    free = size * size - len(safe)
+    if not 0 <= num_mines <= free:
+        raise ValueError(f"cannot place {num_mines} mines: only {free} cells available on a {size}x{size} board")
+    
+    # 安全地帯を除いた free 個のマスから重複なしで選ぶ (棄却サンプリングしない)
+    mines = []
+    for k in rng.sample(range(free), num_mines):
+        for p in safe:
+            if k < p: break
+            k += 1
+        mines.append(k)
+    return mines
 
-def check_win(display, size, num_mines):
-    unopened_or_flagged = 0
-    for r in range(size):
-        for col in range(size):
-            if display[r][col] == c.UNOPENED or display[r][col] == c.FLAGGED:
-                unopened_or_flagged += 1
-    return unopened_or_flagged == num_mines
\ No newline at end of file
+def initialize_board(size, num_mines, y, x, seed=None):
+    """ 最初にクリックした (y, x) とその周囲 3x3 を避けて地雷を置いた盤面を作る
+    
+    seed を渡すと同じ盤面が再現できる。
+    """
+    board = Board(size, num_mines)
+    s = board.stride
+    # 番兵なしの k = r * size + col を番兵付きの添字に直す
+    board.place_mines([(k // size + 1) * s + k % size + 1
+                       for k in sample_mines(size, num_mines, y, x, seed)])
+    return board
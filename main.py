@@ -1,92 +1,154 @@
 # main.py
-import logic
-import view
+# ゲームの進行は session.GameSession が持ち、ここでは画面 (view) をつなぐだけ
+import os
+import time
+
+from session import GameSession
+import replay
+import latency
+from pool import BoardPool
 import consts as c
 
-def main():
-    # 1. スタート画面
-    settings = view.show_start_screen()
-    if settings is None: return
-    
-    board_size, num_mines = settings
-    
-    # 2. 初期化 (LogicとViewの準備)
-    game_view = view.MinesweeperView(board_size, num_mines)
-    init_flag = True
-    is_open_mode = True
-    while  init_flag:
-        click_point = game_view.get_click()
-        if click_point is None: break # ウィンドウが閉じられた
-        
-        # ボタンクリック判定
-        if game_view.is_button_clicked(click_point):
-            is_open_mode = not is_open_mode
-            game_view.update_mode_button(is_open_mode)
-            continue
-            
-        # 盤面クリック判定
-        cell = game_view.get_cell_from_click(click_point)
-        if cell:
-            r, col = cell
-            
-            if is_open_mode:
-                # 開くモード
-                board_data, display_state = logic.initialize_board(board_size, num_mines,r,col)
-                init_flag = False
-                continue
-            
-            # 画面更新
-            game_view.refresh_board(display_state)
-
-    
-    game_over = False
-    
-    # 3. ゲームループ
-    while not game_over:
-        click_point = game_view.get_click()
-        if click_point is None: break # ウィンドウが閉じられた
-        
+class Game:
+    """ GameSession に MinesweeperView をつなぐ (クリックイベントをセッションの操作に変える) """
+
+    def __init__(self, session, game_view, recorder=None, latency_log=None):
+        self.session = session
+        self.view = game_view
+        self.recorder = recorder   # replay.Recorder があれば操作を記録する
+        self.latency = latency_log  # latency.LatencyLog があればクリックごとの時間を測る
+        session.timer = latency_log
+        self.is_open_mode = True
+        self.view.set_click_handler(self.on_click)
+        self.view.set_chord_handler(self.on_chord)
+        self.view.set_key_handler(self.on_key)
+
+    def run(self):
+        self.view.run()
+
+    def on_click(self, click_point):
+        # 決着後は次のクリックで閉じる
+        if self.session.is_over():
+            self.view.close()
+            return
+
         # ボタンクリック判定
-        if game_view.is_button_clicked(click_point):
-            is_open_mode = not is_open_mode
-            game_view.update_mode_button(is_open_mode)
-            continue
-            
+        if self.view.is_button_clicked(click_point):
+            self.is_open_mode = not self.is_open_mode
+            self.view.update_mode_button(self.is_open_mode)
+            return
+
         # 盤面クリック判定
-        cell = game_view.get_cell_from_click(click_point)
+        cell = self.view.get_cell_from_click(click_point)
         if cell:
-            r, col = cell
-            
-            if is_open_mode:
-                # 開くモード
-                if display_state[r][col] != c.FLAGGED:
-                    result = logic.open_cell(board_data, display_state, r, col, board_size)
-                    if result == "GAME_OVER":
-                        game_over = True
-                        game_view.show_message("GAME OVER...", "red")
-                        # 全地雷オープン
-                        for rr in range(board_size):
-                            for cc in range(board_size):
-                                if board_data[rr][cc] == c.MINE:
-                                    display_state[rr][cc] = c.MINE
-            else:
-                # フラグモード
-                logic.toggle_flag(display_state, r, col)
-            
-            # 画面更新
-            game_view.refresh_board(display_state)
-            
-            # 勝利判定
-            if not game_over and logic.check_win(display_state, board_size, num_mines):
-                game_over = True
-                game_view.show_message("YOU WIN!", "green")
-
-    # 終了待機
-    if not game_view.win.isClosed():
-        if game_over:
-            game_view.show_message("Click to Close", "black")
-            game_view.wait_click()
-        game_view.close()
+            self.on_cell(*cell)
+
+    def on_chord(self, click_point):
+        # 数字のマスの周りをまとめて開く (モードに関係なく)
+        # 素早い 2 回目のクリックも <Double-Button-1> としてここに届くので、
+        # 開いた数字のマスでなければ普通のクリックとして扱う (ボタンや旗の付け外しが抜けないように)
+        cell = None if self.session.is_over() else self.view.get_cell_from_click(click_point)
+        if cell and self.session.get(*cell) > 0:
+            self.chord(*cell)
+        else:
+            self.on_click(click_point)
+
+    def chord(self, r, col):
+        self._play(self.session.chord, replay.CHORD, r, col)
+
+    def on_key(self, key):
+        # z で 1 手戻す、y でやり直す
+        if key == "z":
+            self.undo()
+        elif key == "y":
+            self.redo()
+
+    def undo(self):
+        self._rewind(self.session.undo, replay.UNDO)
+
+    def redo(self):
+        self._rewind(self.session.redo, replay.REDO)
+
+    def _rewind(self, step, action):
+        session = self.session
+        board = session.board
+        changed = step()
+        if self.recorder is not None:
+            self.recorder.record(action, 0, 0)
+        if not changed: return
+        # 最初の手を取り消すと盤面が None になるので、取り消す前の盤面で描く
+        self.view.refresh_board(session.board or board, changed)
+        self.view.clear_messages()
+        self.show_result()
+
+    def on_cell(self, r, col):
+        if self.is_open_mode:
+            # 開くモード (最初の 1 回で盤面が作られる)
+            self._play(self.session.open, replay.OPEN, r, col)
+        else:
+            # フラグモード
+            self._play(self.session.toggle_flag, replay.FLAG, r, col)
+
+    def _play(self, step, action, r, col):
+        # 計測しないときは latency が None なので、時間を取る処理は 1 つも走らない
+        timer = self.latency
+        if timer is not None: timer.start()
+        changed = step(r, col)
+        if self.recorder is not None:
+            self.recorder.record(action, r, col)
+        if timer is not None: timer.mark("logic")
+        if changed:
+            with self.view.batch():
+                # 画面更新 (変化したマスだけ)
+                self.view.refresh_board(self.session.board, changed)
+                if timer is not None: timer.mark("render")
+                self.show_result()
+                if timer is not None: timer.mark("message")
+            if timer is not None: timer.mark("flush")
+        if timer is not None: timer.finish()
+
+    def show_result(self):
+        # 勝敗表示
+        session = self.session
+        if session.state == c.LOST:
+            self.view.show_message("GAME OVER...", "red")
+        elif session.state == c.WON:
+            self.view.show_message("YOU WIN!", "green")
+        if session.is_over():
+            self.view.show_message("Click to Close", "black")
+
+def main():
+    # 画面は必要になってから読み込む (graphics は import 時に Tk を起動するため)
+    import view
+
+    # 難易度を選んでいる間に盤面を作り置きしておく。推測なしで解ける盤面は作るのが重いので、
+    # スタート画面で「推測なし」が ON になってから作り始める
+    pools = {False: BoardPool(c.DIFFICULTIES, no_guess=False).start(),
+             True: BoardPool(c.DIFFICULTIES, no_guess=True)}
+    def on_no_guess(no_guess):
+        if no_guess: pools[True].start()
+
+    # 1. スタート画面
+    settings = view.show_start_screen(c.NO_GUESS, on_no_guess)
+    if settings is None: return
+
+    board_size, num_mines, no_guess = settings
+
+    # 2. ゲーム画面 (クリックはイベントとして届く)
+    session = GameSession(board_size, num_mines, no_guess=no_guess, pool=pools[no_guess])
+    # 操作はすべて replays/ に記録する (python replay.py <ファイル> で再生できる)
+    os.makedirs("replays", exist_ok=True)
+    recorder = replay.Recorder(os.path.join("replays", time.strftime("%Y%m%d-%H%M%S.msr")), session)
+    # MINESWEEPER_LATENCY を設定すると、クリックごとの時間の内訳を終了時に書き出す
+    game = Game(session, view.MinesweeperView(board_size, num_mines), recorder, latency.from_env())
+    try:
+        game.run()
+    finally:
+        recorder.close()
+
+    # 終了
+    if not game.view.is_closed():
+        game.view.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,254 @@
+# mmboard.py
+# メモリに載りきらない巨大な盤面 (20000x20000 など) をファイルに置いて mmap で扱う
+#
+#   ファイルの中身
+#     ヘッダ 64 バイト: マジック b"MSMM", サイズ, 地雷数, 開いたマス数, 旗の数
+#     地雷のビット列 (1 マス 1 ビット, 行優先)
+#     表示状態 (1 マス 4 ビット, 値は表示の値 + 4)
+#
+# 盤面全体を Python のオブジェクトにすることはないので、メモリ使用量は
+# 生成時の 1 帯分 (BAND_ROWS 行) と、連鎖オープン中のスタックだけで決まる
+import mmap
+import random
+import struct
+
+import consts as c
+
+MAGIC = b"MSMM"
+_HEADER = struct.Struct("<4sQQQQ")
+HEADER_SIZE = 64
+BAND_ROWS = 64          # 生成は 64 行ずつ (8 の倍数なのでビット列がバイト境界にそろう)
+
+_UNOPENED = c.UNOPENED - c.BORDER
+_FLAGGED = c.FLAGGED - c.BORDER
+_MINE = c.MINE - c.BORDER
+
+class MappedBoard:
+    """ 地雷と表示状態を mmap したファイルに持つ盤面 (logic.Board と同じ操作を持つ)
+
+    マスの添字は番兵なしの r * size + col。周りの地雷数は保存せず、
+    開くときに地雷のビットから数える。
+    """
+
+    def __init__(self, path):
+        """ create() で作ったファイルを開く """
+        self.path = path
+        self.file = open(path, "r+b")
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        magic, size, num_mines, opened, flags = _HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError("not a mapped minesweeper board")
+        self.size = size
+        self.num_mines = num_mines
+        self.opened = opened
+        self.flags = flags
+        self.mine_offset = HEADER_SIZE
+        self.display_offset = HEADER_SIZE + (size * size + 7) // 8
+
+    @classmethod
+    def create(cls, path, size, num_mines, y, x, seed=None):
+        """ (y, x) の周り 3x3 を避けて地雷を置いたファイルを作り、開いて返す
+
+        帯ごとの地雷の数は NumPy の有無で引き方が変わる (_hypergeometric_sampler) ので、
+        同じ seed でも NumPy がある環境と無い環境では配置が一致しない。
+        """
+        area = size * size
+        safe = sorted((y + dy) * size + x + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                      if 0 <= y + dy < size and 0 <= x + dx < size)
+        free = area - len(safe)
+        if not 0 <= num_mines <= free:
+            raise ValueError(f"cannot place {num_mines} mines: only {free} cells available on a {size}x{size} board")
+
+        rng = random.Random(seed)
+        draw = _hypergeometric_sampler(seed)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, size, num_mines, 0, 0).ljust(HEADER_SIZE, b"\0"))
+
+            # 帯ごとに「この帯に入る地雷の数」を超幾何分布で決めてから、帯の中で選ぶ
+            left_cells, left_mines = free, num_mines
+            for top in range(0, size, BAND_ROWS):
+                start, end = top * size, min(top + BAND_ROWS, size) * size
+                band_safe = [k - start for k in safe if start <= k < end]
+                cells = end - start - len(band_safe)
+                k = draw(left_mines, left_cells - left_mines, cells) if end < area else left_mines
+                left_cells -= cells
+                left_mines -= k
+
+                band = bytearray(b"0" * (end - start))
+                for j in rng.sample(range(cells), k):
+                    for p in band_safe:
+                        if j < p: break
+                        j += 1
+                    band[j] = 0x31   # "1"
+                if end == area and area % 8:
+                    band += b"0" * (8 - area % 8)
+                f.write(int(band, 2).to_bytes(len(band) // 8, "big"))
+
+            # 表示状態は全部「未オープン」(4 ビットを 2 つ並べたバイト)
+            fill = bytes([_UNOPENED << 4 | _UNOPENED]) * (1 << 20)
+            remaining = (area + 1) // 2
+            while remaining > 0:
+                f.write(fill[:min(remaining, len(fill))])
+                remaining -= len(fill)
+        return cls(path)
+
+    # --- 低レベルの読み書き ---
+
+    def _is_mine(self, k):
+        return self.mm[self.mine_offset + (k >> 3)] >> (7 - (k & 7)) & 1
+
+    def _count(self, r, col):
+        size = self.size
+        n = 0
+        for nr in (r - 1, r, r + 1):
+            if not 0 <= nr < size: continue
+            for nc in (col - 1, col, col + 1):
+                if 0 <= nc < size and self._is_mine(nr * size + nc): n += 1
+        return n
+
+    def _code(self, k):
+        b = self.mm[self.display_offset + (k >> 1)]
+        return b & 15 if k & 1 else b >> 4
+
+    def _set_code(self, k, code):
+        i = self.display_offset + (k >> 1)
+        b = self.mm[i]
+        self.mm[i] = (b & 0xf0 | code) if k & 1 else (b & 0x0f | code << 4)
+
+    # --- logic.Board と同じ操作 ---
+
+    def index(self, r, col):
+        return r * self.size + col
+
+    def coords(self, k):
+        return divmod(k, self.size)
+
+    def get(self, r, col):
+        return self._code(r * self.size + col) + c.BORDER
+
+    def is_mine(self, r, col):
+        return bool(self._is_mine(r * self.size + col))
+
+    def open_cell(self, r, col, revealed=None):
+        """ マスを開く。地雷なら "GAME_OVER" を返す (logic.Board.open_cell と同じ) """
+        size = self.size
+        if not (0 <= r < size and 0 <= col < size): return
+        k = r * size + col
+        if self._code(k) != _UNOPENED: return
+        if self._is_mine(k):
+            self._set_code(k, _MINE)
+            if revealed is not None: revealed.append(k)
+            return "GAME_OVER"
+
+        # スキャンライン方式の連鎖オープン。スタックには (行, 0 が続く区間) を積む
+        code, set_code, count = self._code, self._set_code, self._count
+        opened = 0
+        n = count(r, col)
+        if n:
+            set_code(k, n - c.BORDER)
+            self.opened += 1
+            if revealed is not None: revealed.append(k)
+            return
+
+        def zero_unopened(row, x):
+            kk = row * size + x
+            return code(kk) == _UNOPENED and not self._is_mine(kk) and count(row, x) == 0
+
+        stack = [(r, col, col + 1)]
+        while stack:
+            r, left, right = stack.pop()
+            base = r * size
+            if code(base + left) != _UNOPENED: continue
+            while left > 0 and zero_unopened(r, left - 1):
+                left -= 1
+            while right < size and zero_unopened(r, right):
+                right += 1
+            lo, hi = max(left - 1, 0), min(right + 1, size)
+            for x in range(lo, hi):
+                kk = base + x
+                if code(kk) == _UNOPENED:
+                    set_code(kk, (0 if left <= x < right else count(r, x)) - c.BORDER)
+                    opened += 1
+                    if revealed is not None: revealed.append(kk)
+
+            # 上下の行: 数字はその場で開き、0 の区間は新しい種として積む
+            for nr in (r - 1, r + 1):
+                if not 0 <= nr < size: continue
+                nbase = nr * size
+                x = lo
+                while x < hi:
+                    kk = nbase + x
+                    if code(kk) != _UNOPENED:
+                        x += 1
+                        continue
+                    n = count(nr, x)
+                    if n == 0:
+                        start = x
+                        x += 1
+                        while x < hi and zero_unopened(nr, x):
+                            x += 1
+                        stack.append((nr, start, x))
+                    else:
+                        set_code(kk, n - c.BORDER)
+                        opened += 1
+                        if revealed is not None: revealed.append(kk)
+                        x += 1
+        self.opened += opened
+
+    def toggle_flag(self, r, col):
+        k = r * self.size + col
+        code = self._code(k)
+        if code == _UNOPENED:
+            self._set_code(k, _FLAGGED)
+            self.flags += 1
+        elif code == _FLAGGED:
+            self._set_code(k, _UNOPENED)
+            self.flags -= 1
+
+    def remaining_mines(self):
+        return self.num_mines - self.flags
+
+    def check_win(self):
+        return self.opened == self.size * self.size - self.num_mines
+
+    def flush(self):
+        """ カウンタをヘッダに書き戻し、変更をファイルへ反映する """
+        _HEADER.pack_into(self.mm, 0, MAGIC, self.size, self.num_mines, self.opened, self.flags)
+        self.mm.flush()
+
+    def close(self):
+        if self.mm.closed: return
+        self.flush()
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _hypergeometric_sampler(seed):
+    """ 超幾何分布 (good 個の当たりと bad 個の外れから n 個引いたときの当たりの数) の乱数
+
+    NumPy があれば正確な分布を使い、無ければ正規近似で代用する。
+    どちらも引いた値は取り得る範囲に収め、最後の帯で残りを全部置くので
+    地雷の総数は必ず num_mines になる。
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        gen = np.random.default_rng(seed)
+        return lambda good, bad, n: int(gen.hypergeometric(good, bad, n)) if n else 0
+
+    rng = random.Random(None if seed is None else ~seed)
+    def draw(good, bad, n):
+        total = good + bad
+        if n == 0 or total == 0: return 0
+        mean = n * good / total
+        var = mean * (bad / total) * (total - n) / max(total - 1, 1)
+        k = round(rng.gauss(mean, var ** 0.5))
+        return min(max(k, max(0, n - bad)), min(n, good))
+    return draw
@@ -0,0 +1,107 @@
+# pool.py
+# 盤面の作り置き: 最初のクリックの直後に待たされないよう、裏で盤面を作っておく
+import random
+import threading
+
+import logic
+import generator
+
+def _symmetries(n):
+    """ n x n の盤面を自分自身に移す 8 通りの変換 (回転・反転) """
+    m = n - 1
+    return [
+        lambda r, col: (r, col),
+        lambda r, col: (col, m - r),
+        lambda r, col: (m - r, m - col),
+        lambda r, col: (m - col, r),
+        lambda r, col: (r, m - col),
+        lambda r, col: (m - r, col),
+        lambda r, col: (col, r),
+        lambda r, col: (m - col, m - r),
+    ]
+
+def position_class(n, r, col):
+    """ 回転・反転で移り合うクリック位置をまとめた類の代表 (いちばん小さい座標) """
+    return min(f(r, col) for f in _symmetries(n))
+
+class BoardPool:
+    """ (サイズ, 地雷数, 最初のクリック位置の類) ごとに盤面を作り置きする
+
+    作り置きは類の代表の位置をクリックした盤面の seed だけを持ち、
+    取り出すときに実際のクリック位置へ回転・反転して渡す。
+    足りなくなった類はバックグラウンドのスレッドが補充する。
+    """
+
+    def __init__(self, difficulties, per_class=2, no_guess=True, seed=None):
+        self.per_class = per_class
+        self.no_guess = no_guess
+        self.rng = random.Random(seed)
+        self.boards = {}   # (size, num_mines, 代表の位置) -> [盤面の seed, ...]
+        for size, num_mines in difficulties:
+            for r in range(size):
+                for col in range(size):
+                    if position_class(size, r, col) == (r, col):
+                        self.boards[(size, num_mines, (r, col))] = []
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopped = False
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+        """ 補充スレッドを起動する (デーモンなのでプログラム終了時に止まる) """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._fill, name="BoardPool", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def take(self, size, num_mines, r, col):
+        """ (r, col) を最初に開く盤面を返す。作り置きが無ければ None """
+        canon = position_class(size, r, col)
+        with self.cond:
+            seeds = self.boards.get((size, num_mines, canon))
+            if not seeds:
+                self.misses += 1
+                return None
+            board_seed = seeds.pop()
+            self.hits += 1
+            self.cond.notify()
+
+        board = logic.initialize_board(size, num_mines, canon[0], canon[1], board_seed)
+        if canon == (r, col):
+            return board
+        # 代表の位置 canon を (r, col) に移す変換で、地雷の位置も移す
+        f = next(f for f in _symmetries(size) if f(*canon) == (r, col))
+        moved = logic.Board(size, num_mines)
+        moved.place_mines([moved.index(*f(*board.coords(i))) for i in board.mine_indices()])
+        return moved
+
+    def _fill(self):
+        while True:
+            with self.cond:
+                # いちばん少ない類から補充する。全部埋まっていれば取り出されるまで待つ
+                while not self.stopped:
+                    key = min(self.boards, key=lambda k: len(self.boards[k]))
+                    if len(self.boards[key]) < self.per_class: break
+                    self.cond.wait()
+                if self.stopped: return
+                seed = self.rng.randrange(1 << 32)
+
+            size, num_mines, (r, col) = key
+            board_seed = self._generate(size, num_mines, r, col, seed)
+            with self.cond:
+                self.boards[key].append(board_seed)
+
+    def _generate(self, size, num_mines, r, col, seed):
+        if self.no_guess:
+            _, board_seed = generator.generate_no_guess(size, num_mines, r, col, seed)
+            return board_seed
+        return seed
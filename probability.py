@@ -0,0 +1,220 @@
+# probability.py
+# 推論で確定しないときのために、各マスが地雷である確率を正確に求める
+from functools import lru_cache
+from math import comb
+import consts as c
+
+def mine_probabilities(board):
+    """ 開いていないマス (旗を含む) ごとの地雷確率を {添字: 確率} で返す
+
+    1. 数字マスの周りの未オープンのマス (フロンティア) を、同じ数字を共有するもの
+       同士でつないで独立な成分に分ける
+    2. 成分ごとに矛盾しない地雷の置き方を数える (地雷数ごとの通り数)。
+       同じ形の成分は結果を使い回す
+    3. 成分の外のマスに残りの地雷を置く通り数 comb(外のマス数, 残り) を重みにして、
+       盤面全体の地雷数 num_mines と合うように組み合わせる
+    """
+    display, neighbors = board.display, board.neighbors
+    UNOPENED, FLAGGED = c.UNOPENED, c.FLAGGED
+
+    # 数字マスごとの制約 (周りの未オープンのマス, 地雷数)
+    unknown_cells = []
+    constraints = []
+    cell_constraints = {}
+    for i in range(len(display)):
+        v = display[i]
+        if v == UNOPENED or v == FLAGGED:
+            unknown_cells.append(i)
+        elif v > 0:
+            cells = [i + d for d in neighbors if display[i + d] in (UNOPENED, FLAGGED)]
+            if cells:
+                for j in cells:
+                    cell_constraints.setdefault(j, []).append(len(constraints))
+                constraints.append((cells, v))
+
+    # 成分に分ける (幅優先でたどった順に番号を振る)
+    components = []
+    seen = set()
+    for start in cell_constraints:
+        if start in seen: continue
+        seen.add(start)
+        order = [start]
+        used = set()
+        for j in order:
+            for a in cell_constraints[j]:
+                if a in used: continue
+                used.add(a)
+                for x in constraints[a][0]:
+                    if x not in seen:
+                        seen.add(x)
+                        order.append(x)
+        local = {j: n for n, j in enumerate(order)}
+        signature = tuple(sorted(
+            (tuple(sorted(local[x] for x in constraints[a][0])), constraints[a][1])
+            for a in used))
+        components.append((order, _count_component(len(order), signature)))
+
+    outside = len(unknown_cells) - len(seen)
+    remaining = board.num_mines
+
+    # 全成分の地雷数の分布を畳み込んだもの (ある成分を除いたものも作る)
+    def convolve(dists):
+        total = [1]
+        for w in dists:
+            out = [0] * (len(total) + len(w) - 1)
+            for m1, a in enumerate(total):
+                if not a: continue
+                for m2, b in enumerate(w):
+                    if b: out[m1 + m2] += a * b
+            total = out
+        return total
+
+    def weight(m):
+        # 成分の外のマスに、残りの remaining - m 個を置く通り数
+        rest = remaining - m
+        return comb(outside, rest) if 0 <= rest <= outside else 0
+
+    all_dist = convolve([w for _, (w, _) in components])
+    total = sum(n * weight(m) for m, n in enumerate(all_dist))
+    if total == 0:
+        return {}   # 表示と地雷数が矛盾している
+
+    probs = {}
+    for k, (order, (w, per_cell)) in enumerate(components):
+        others = convolve([w2 for n, (_, (w2, _)) in enumerate(components) if n != k])
+        # この成分の地雷数が m のときの、他の成分と外側をまとめた重み (解のある m だけ)
+        scale = [(m, sum(n * weight(m + m2) for m2, n in enumerate(others)))
+                 for m in range(len(w)) if w[m]]
+        for x, j in enumerate(order):
+            counts = per_cell[x]
+            probs[j] = sum(counts[m] * s for m, s in scale) / total
+
+    if outside:
+        # 成分の外のマスはどれも同じ確率
+        inside = sum(n * (comb(outside - 1, remaining - m - 1) if 0 <= remaining - m - 1 <= outside - 1 else 0)
+                     for m, n in enumerate(all_dist))
+        p = inside / total
+        for j in unknown_cells:
+            if j not in seen:
+                probs[j] = p
+    return probs
+
+def best_guess(board):
+    """ 地雷確率が最も低いマスの (添字, 確率)。候補が無ければ None """
+    probs = mine_probabilities(board)
+    if not probs: return None
+    i = min(probs, key=probs.get)
+    return i, probs[i]
+
+@lru_cache(maxsize=4096)
+def _count_component(n, signature):
+    """ n 個のマスと制約 signature ((マス番号の組, 地雷数), ...) について
+    地雷数 m ごとの解の数 w[m] と、各マスが地雷になる解の数 per_cell[x][m] を返す
+
+    マスを 1 つずつ決めていく動的計画法。途中の状態は「決めたマスと決めていないマスに
+    またがる制約の、残りの地雷数」の組だけで決まるので、同じ状態になった置き方は
+    まとめて数える。数えた結果は地雷数 m ごとの通り数を並べた多項式で、これを
+    1 つの int (m の係数を K ビットずつ) に詰めておくと、足し算と掛け算が int の演算 1 回で済む。
+    前から数えたもの (F) と後ろから数えたもの (B) を掛ければ、マスごとの数も
+    盤面全体を列挙し直さずに求まる。
+    """
+    order = _cell_order(n, signature)
+    rank = [0] * n
+    for i, x in enumerate(order):
+        rank[x] = i
+    cons = [(sorted(rank[x] for x in cells), k) for cells, k in signature]
+
+    # 係数は解の総数 (2^n 以下) を超えないので、n + 1 ビット以上あれば隣にあふれない
+    nbytes = (n + 8) // 8
+    K = 8 * nbytes
+
+    # i 番目のマスの前の切れ目にかかっている制約 (active[i]) と、i 番目を決めたときの変わり方
+    starts = [[] for _ in range(n)]
+    for a, (cells, k) in enumerate(cons):
+        starts[cells[0]].append(a)
+    steps = []
+    active = []
+    for i in range(n):
+        nxt, plan, ends = [], [], []
+        pos = {a: p for p, a in enumerate(active)}
+        for a in active + starts[i]:
+            cells, k = cons[a]
+            has = i in cells
+            after = sum(1 for x in cells if x > i)   # i 番目より後ろにある、この制約のマスの数
+            if has and after == 0:
+                # この制約は i 番目で終わる。残りが v (i 番目の値) でなければ矛盾
+                ends.append(pos.get(a, -1 - k))
+                continue
+            nxt.append(a)
+            plan.append((pos.get(a, -1), k, has, after))
+        steps.append((plan, ends))
+        active = nxt
+
+    # 前から: F[i] は i 番目より前を決めたときの {状態: 多項式}
+    F = [{(): 1}]
+    edges = []
+    for plan, ends in steps:
+        cur, out, e = F[-1], {}, []
+        for state, poly in cur.items():
+            for v in (0, 1):
+                if any((state[p] if p >= 0 else -1 - p) != v for p in ends): continue
+                new = []
+                for src, k, has, after in plan:
+                    need = (state[src] if src >= 0 else k) - (v if has else 0)
+                    if need < 0 or need > after: break
+                    new.append(need)
+                else:
+                    new = tuple(new)
+                    out[new] = out.get(new, 0) + (poly << K if v else poly)
+                    e.append((state, v, new))
+        F.append(out)
+        edges.append(e)
+
+    # 後ろから: B[i] は i 番目から後ろを、状態から矛盾なく決める通り数
+    B = [None] * n + [{(): 1}]
+    for i in range(n - 1, -1, -1):
+        nxt, out = B[i + 1], {}
+        for state, v, new in edges[i]:
+            if new in nxt:
+                out[state] = out.get(state, 0) + (nxt[new] << K if v else nxt[new])
+        B[i] = out
+
+    # 解のある地雷数は lo..hi に限られるので、その範囲の係数だけを取り出す
+    total = F[n].get((), 0)
+    lo = (total & -total).bit_length() // K if total else 0
+    hi = (total.bit_length() - 1) // K if total else -1
+    def coefficients(poly):
+        data = (poly >> lo * K).to_bytes((hi - lo + 1) * nbytes, "little")
+        return ([0] * lo + [int.from_bytes(data[j:j + nbytes], "little")
+                            for j in range(0, len(data), nbytes)] + [0] * (n - hi))
+
+    w = coefficients(total)
+    per_cell = [None] * n
+    for i in range(n):
+        # i 番目を地雷にした置き方だけを前後でつなぐ
+        before, nxt = F[i], B[i + 1]
+        mined = 0
+        for state, v, new in edges[i]:
+            if v and new in nxt:
+                mined += before[state] * nxt[new]
+        per_cell[order[i]] = coefficients(mined << K)
+    return w, per_cell
+
+def _cell_order(n, signature):
+    """ 切れ目にかかる制約が少なくなるよう、端のマスから幅優先でたどった順 """
+    adjacent = [set() for _ in range(n)]
+    for cells, _ in signature:
+        for x in cells:
+            adjacent[x].update(cells)
+
+    def bfs(start):
+        order, seen = [start], {start}
+        for x in order:
+            for y in sorted(adjacent[x]):
+                if y not in seen:
+                    seen.add(y)
+                    order.append(y)
+        return order
+
+    # 1 回たどって最後に着いたマス (端にあるマス) から、もう 1 度たどる
+    return bfs(bfs(0)[-1])
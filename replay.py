@@ -0,0 +1,187 @@
+# replay.py
+# 操作の記録と再生: 遅かったりおかしかったりしたゲームをあとで再現するため
+#
+#   ヘッダ (22 バイト, リトルエンディアン)
+#     マジック b"MSRC", 版 (1), no_guess, サイズ, 地雷数, seed (8 バイト)
+#   レコード (13 バイト) を追記していく
+#     動作 (1 バイト), 行, 列, 開始からの秒数 (float)
+#     LAYOUT: 行 = 続くデータの長さ。データは地雷のビット列 (zlib 圧縮)。
+#             作り置きの盤面は seed から作れないので、盤面を作った OPEN の前に置く
+#     UNDO / REDO: 行と列は使わない
+#     END:    行 = 表示状態の crc32, 列 = 決着 (0: 途中, 1: 勝ち, 2: 負け)
+import struct
+import sys
+import time
+import zlib
+
+from session import GameSession
+import savefile
+import consts as c
+
+MAGIC = b"MSRC"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBIIQ")
+_RECORD = struct.Struct("<BIIf")
+_STATES = [c.PLAYING, c.WON, c.LOST]
+
+OPEN = 1
+FLAG = 2
+LAYOUT = 3
+UNDO = 4
+REDO = 5
+CHORD = 6
+END = 255
+
+def display_crc(board):
+    """ 表示状態のチェックサム (盤面が無ければ 0) """
+    if board is None: return 0
+    return zlib.crc32(board.display.tobytes())
+
+class Recorder:
+    """ GameSession への操作を追記専用のファイルに書いていく
+
+    1 手ごとに flush するので、途中で落ちてもそこまでの記録は残る。
+    """
+
+    def __init__(self, path, session):
+        self.session = session
+        self.file = open(path, "wb")
+        self.start = time.perf_counter()
+        self.board = None   # 直前に記録したときの session.board
+        self.file.write(_HEADER.pack(MAGIC, VERSION, session.no_guess, session.size,
+                                     session.num_mines, session.seed))
+        self.file.flush()
+
+    def record(self, action, r, col):
+        """ session に action を行った直後に呼ぶ """
+        t = time.perf_counter() - self.start
+        session = self.session
+        if action == OPEN and self.board is None and session.board is not None and session.pooled:
+            # 盤面ができたのはこの手で、作り置きからなので seed から作れない。先に配置を書いておく
+            layout = zlib.compress(savefile.mine_bits(session.board))
+            self.file.write(_RECORD.pack(LAYOUT, len(layout), 0, t) + layout)
+        # 最初の手を undo すると盤面は None に戻るので、手ごとに覚え直す
+        self.board = session.board
+        self.file.write(_RECORD.pack(action, r, col, t))
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed: return
+        session = self.session
+        t = time.perf_counter() - self.start
+        self.file.write(_RECORD.pack(END, display_crc(session.board),
+                                     _STATES.index(session.state), t))
+        self.file.close()
+
+def read(path):
+    """ 記録を読み込み、(ヘッダの dict, [(動作, 行, 列, 秒数, データ), ...]) を返す """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, no_guess, size, num_mines, seed = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a minesweeper replay")
+    if version != VERSION:
+        raise ValueError(f"unsupported replay version {version}")
+    header = {"size": size, "num_mines": num_mines, "seed": seed, "no_guess": bool(no_guess)}
+
+    records = []
+    pos = _HEADER.size
+    # 最後のレコードが書きかけ (途中で落ちた) なら捨てる
+    while pos + _RECORD.size <= len(data):
+        action, r, col, t = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        payload = b""
+        if action == LAYOUT:
+            payload = zlib.decompress(data[pos:pos + r])
+            pos += r
+        records.append((action, r, col, t, payload))
+    return header, records
+
+class _LayoutPool:
+    """ LAYOUT レコードの盤面を、次に盤面を作るときに 1 回だけ渡す (pool.BoardPool の代わり)
+
+    GameSession の盤面作りを通すので、記録したときと同じく最初の手の前の盤面は None になる。
+    """
+
+    def __init__(self):
+        self.board = None
+
+    def take(self, size, num_mines, r, col):
+        board, self.board = self.board, None
+        return board
+
+def replay(path, game_view=None):
+    """ 記録どおりに GameSession を動かし直す
+
+    game_view が無ければ待たずに全部実行する。あれば main.Game を通して
+    記録された間隔で画面に描く。END レコードの状態と一致しなければ ValueError。
+    """
+    header, records = read(path)
+    layouts = _LayoutPool()
+    session = GameSession(header["size"], header["num_mines"], header["seed"],
+                          no_guess=header["no_guess"], pool=layouts)
+    game = None
+    if game_view is not None:
+        from main import Game
+        game = Game(session, game_view)
+    start = time.perf_counter()
+
+    for action, r, col, t, payload in records:
+        if action == LAYOUT:
+            layouts.board = savefile.board_from_mine_bits(session.size, session.num_mines, payload)
+        elif action == END:
+            state = _STATES[col]
+            crc = display_crc(session.board)
+            if session.state != state or crc != r:
+                raise ValueError(f"replay diverged: expected {state} (crc {r:08x}), "
+                                 f"got {session.state} (crc {crc:08x})")
+        elif game is not None:
+            delay = t - (time.perf_counter() - start)
+            if delay > 0: time.sleep(delay)
+            if action == UNDO:
+                game.undo()
+            elif action == REDO:
+                game.redo()
+            elif action == CHORD:
+                game.chord(r, col)
+            else:
+                game.is_open_mode = action == OPEN
+                game.on_cell(r, col)
+        elif action == OPEN:
+            session.open(r, col)
+        elif action == FLAG:
+            session.toggle_flag(r, col)
+        elif action == UNDO:
+            session.undo()
+        elif action == REDO:
+            session.redo()
+        elif action == CHORD:
+            session.chord(r, col)
+    return session
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay a recorded minesweeper game")
+    parser.add_argument("path")
+    parser.add_argument("--show", action="store_true", help="draw the game at the recorded pace")
+    args = parser.parse_args(argv)
+
+    game_view = None
+    if args.show:
+        import view
+        header, _ = read(args.path)
+        game_view = view.MinesweeperView(header["size"], header["num_mines"])
+    start = time.perf_counter()
+    try:
+        session = replay(args.path, game_view)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"{session.state} after {session.moves} moves ({time.perf_counter() - start:.3f}s)")
+    if game_view is not None and not game_view.is_closed():
+        game_view.set_click_handler(lambda p: game_view.close())
+        game_view.run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# savefile.py
+# ゲームの保存/読み込み (小さなバイナリ形式)
+#
+#   ヘッダ (30 バイト, リトルエンディアン)
+#     マジック b"MSWP", 版 (1), フラグ (bit0: 盤面あり, bit1-2: 状態),
+#     サイズ, 地雷数, seed (8 バイト), 手数, 本体の長さ
+#   本体 (zlib 圧縮)
+#     地雷のビット列 (1 マス 1 ビット, 行優先) + 表示状態 (1 マス 4 ビット)
+#
+# 1 マスずつ Python で回さず、bytes.translate と巨大な int の演算でまとめて詰める
+import struct
+import zlib
+from array import array
+
+import logic
+from session import GameSession
+import consts as c
+
+MAGIC = b"MSWP"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBIIQII")
+_STATES = [c.PLAYING, c.WON, c.LOST]
+
+# 表示の値 (-4..8) <-> 4 ビット (0..12)。array("b") のバイトは符号なしで見えるので & 0xff で引く
+_TO_NIBBLE = bytearray(range(256))
+_FROM_NIBBLE = bytearray(range(256))
+for _v in range(c.BORDER, 9):
+    _TO_NIBBLE[_v & 0xff] = _v - c.BORDER
+    _FROM_NIBBLE[_v - c.BORDER] = _v & 0xff
+_TO_NIBBLE = bytes(_TO_NIBBLE)
+_FROM_NIBBLE = bytes(_FROM_NIBBLE)
+_MINE_BIT = bytes(0x31 if b == c.MINE & 0xff else 0x30 for b in range(256))  # 地雷 -> "1"
+
+def _interior(board, layer):
+    """ 番兵を除いた size*size マス分のバイト列 (行優先) """
+    size = board.size
+    return b"".join(layer[board.index(r, 0):board.index(r, 0) + size].tobytes() for r in range(size))
+
+def _pack_nibbles(data):
+    # 各バイトは 16 未満なので、偶数番目を 4 ビットずらして奇数番目と OR すれば
+    # バイトの境界をまたがずに 2 マスが 1 バイトに収まる
+    if len(data) % 2: data += b"\0"
+    n = len(data) // 2
+    packed = int.from_bytes(data[0::2], "big") << 4 | int.from_bytes(data[1::2], "big")
+    return packed.to_bytes(n, "big")
+
+def _unpack_nibbles(packed, count):
+    n = len(packed)
+    value = int.from_bytes(packed, "big")
+    low = int.from_bytes(b"\x0f" * n, "big")
+    out = bytearray(2 * n)
+    out[0::2] = ((value >> 4) & low).to_bytes(n, "big")
+    out[1::2] = (value & low).to_bytes(n, "big")
+    return bytes(out[:count])
+
+def mine_bits(board):
+    """ 地雷の配置だけを 1 マス 1 ビットのバイト列にする (行優先) """
+    area = board.size * board.size
+    bits = _interior(board, board.cells).translate(_MINE_BIT)
+    return int(bits, 2).to_bytes((area + 7) // 8, "big")
+
+def board_from_mine_bits(size, num_mines, data):
+    """ mine_bits のバイト列から、まだどこも開いていない盤面を作る """
+    area = size * size
+    bits = format(int.from_bytes(data[:(area + 7) // 8], "big"), "b").zfill(area)
+    board = logic.Board(size, num_mines)
+    mines = []
+    k = bits.find("1")
+    while k >= 0:
+        mines.append(board.index(*divmod(k, size)))
+        k = bits.find("1", k + 1)
+    board.place_mines(mines)
+    return board
+
+def dumps(session):
+    """ GameSession をバイト列にする """
+    board = session.board
+    flags = _STATES.index(session.state) << 1
+    body = b""
+    if board is not None:
+        flags |= 1
+        mines = mine_bits(board)
+        display = _pack_nibbles(_interior(board, board.display).translate(_TO_NIBBLE))
+        body = zlib.compress(mines + display)
+    header = _HEADER.pack(MAGIC, VERSION, flags, session.size, session.num_mines,
+                          session.seed, session.moves, len(body))
+    return header + body
+
+def loads(data):
+    """ dumps で作ったバイト列から GameSession を作り直す (壊れていれば ValueError) """
+    if len(data) < _HEADER.size:
+        raise ValueError("save file is truncated")
+    magic, version, flags, size, num_mines, seed, moves, length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a minesweeper save file")
+    if version != VERSION:
+        raise ValueError(f"unsupported save file version {version}")
+    state = flags >> 1 & 3
+    if state >= len(_STATES):
+        raise ValueError(f"invalid game state {state} in save file")
+    session = GameSession(size, num_mines, seed)
+    session.moves = moves
+    session.state = _STATES[state]
+    if not flags & 1:
+        return session
+
+    area = size * size
+    try:
+        body = zlib.decompress(data[_HEADER.size:_HEADER.size + length])
+    except zlib.error as e:
+        raise ValueError(f"save file body is corrupt ({e})") from None
+    mine_bytes = (area + 7) // 8
+    if len(body) != mine_bytes + (area + 1) // 2:
+        raise ValueError("save file body has the wrong length")
+    display = _unpack_nibbles(body[mine_bytes:], area).translate(_FROM_NIBBLE)
+
+    board = board_from_mine_bits(size, num_mines, body[:mine_bytes])
+    for r in range(size):
+        start = board.index(r, 0)
+        board.display[start:start + size] = array("b", display[r * size:(r + 1) * size])
+
+    # カウンタは表示状態から数え直す (bytes.count なので速い)
+    hidden = sum(display.count(v & 0xff) for v in (c.UNOPENED, c.FLAGGED, c.MINE))
+    board.opened = area - hidden
+    board.flags = display.count(c.FLAGGED & 0xff)
+    session.board = board
+    return session
+
+def save(session, path):
+    with open(path, "wb") as f:
+        f.write(dumps(session))
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
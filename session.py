@@ -0,0 +1,171 @@
+# session.py
+# GUI に依存しないゲーム進行 (Tk を import しないので、画面の無い環境でも動く)
+import random
+from array import array
+import logic
+import consts as c
+
+class Delta:
+    """ 1 手分の差分: 変化したマスの添字と、その手の前の値とカウンタ
+
+    盤面全体は写さないので、履歴の大きさは変化したマスの数に比例する。
+    undo/redo は盤面と差分の値を入れ替えるだけ (入れ替えた後は逆向きの差分になる)。
+    """
+    __slots__ = ("indices", "values", "counters", "board")
+
+    def __init__(self, indices, values, counters, board):
+        self.indices = array("i", indices)
+        self.values = values       # array("b")
+        self.counters = counters   # (opened, flags, state, moves)
+        self.board = board         # この手の前の盤面 (最初の手の前は None)
+
+class GameSession:
+    """ 1 回分のゲーム: 初手安全な盤面生成・開く・旗・勝敗判定
+
+    操作はどれも変化したマスの添字のリストを返すので、
+    画面側 (MinesweeperView など) はそのマスだけを描き直せばよい。
+    undo/redo も同じように、戻したマスの添字のリストを返す。
+    """
+
+    def __init__(self, size, num_mines, seed=None, no_guess=False, pool=None):
+        self.size = size
+        self.num_mines = num_mines
+        self.no_guess = no_guess   # True なら推測なしで解ける盤面を作る
+        self.pool = pool           # pool.BoardPool があれば、まず作り置きから取る
+        # seed を決めておけば、同じ手順で同じゲームが再現できる
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.board = None          # 最初に開いたマスが決まってから作る
+        self.pooled = False        # 盤面を作り置きから取ったか (そのときは seed から再現できない)
+        self.state = c.PLAYING
+        self.moves = 0
+        self.history = []          # Delta のリスト (undo で戻る手)
+        self.timer = None          # latency.LatencyLog があれば勝利判定の時間を測る
+        self.future = []           # undo した手 (redo でやり直す)
+
+    def is_over(self):
+        return self.state != c.PLAYING
+
+    def get(self, r, col):
+        if self.board is None: return c.UNOPENED
+        return self.board.get(r, col)
+
+    def remaining_mines(self):
+        if self.board is None: return self.num_mines
+        return self.board.remaining_mines()
+
+    def open(self, r, col):
+        """ マスを開く。盤面がまだ無ければ (r, col) を安全地帯にして作る """
+        changed = []
+        if self.is_over(): return changed
+        counters, before = self._counters(), self.board
+        if self.board is None:
+            self.board = self._new_board(r, col)
+
+        board = self.board
+        if board.get(r, col) == c.FLAGGED: return changed
+        self._finish(board.open_cell(r, col, changed), changed, counters, before)
+        return changed
+
+    def chord(self, r, col):
+        """ 開いた数字のマスで、周りの旗が数字と同じ数なら残りの周りのマスを開く """
+        changed = []
+        if self.is_over() or self.board is None: return changed
+        counters = self._counters()
+        self._finish(self.board.chord(r, col, changed), changed, counters, self.board)
+        return changed
+
+    def _finish(self, result, changed, counters, before):
+        # 開いた結果から勝敗を決め、差分を履歴に積む
+        board = self.board
+        flagged = ()
+        if result == "GAME_OVER":
+            self.state = c.LOST
+            # 旗の立っていた地雷も表示が変わるので、戻すときのために覚えておく
+            flagged = {i for i in board.mine_indices() if board.display[i] == c.FLAGGED}
+            board.reveal_mines(changed)
+        else:
+            timer = self.timer
+            if timer is not None: timer.mark("logic")
+            won = board.check_win()
+            if timer is not None: timer.mark("win_check")
+            if won: self.state = c.WON
+        if changed:
+            self.moves += 1
+            # open_cell が開くのは未オープンのマスだけ
+            values = array("b", [c.UNOPENED]) * len(changed)
+            for k, i in enumerate(changed):
+                if i in flagged: values[k] = c.FLAGGED
+            self._push(Delta(changed, values, counters, before))
+
+    def _new_board(self, r, col):
+        if self.pool is not None:
+            board = self.pool.take(self.size, self.num_mines, r, col)
+            if board is not None:
+                self.pooled = True
+                return board
+        self.pooled = False
+        if self.no_guess:
+            # ソルバーを使うので、必要になったときだけ読み込む
+            import generator
+            board, _ = generator.generate_no_guess(self.size, self.num_mines, r, col, self.seed)
+            return board
+        return logic.initialize_board(self.size, self.num_mines, r, col, self.seed)
+
+    def toggle_flag(self, r, col):
+        changed = []
+        # 盤面ができる前 (最初のクリック前) は旗を立てられない
+        if self.is_over() or self.board is None: return changed
+
+        board = self.board
+        value = board.get(r, col)
+        if value in (c.UNOPENED, c.FLAGGED):
+            counters = self._counters()
+            board.toggle_flag(r, col)
+            changed.append(board.index(r, col))
+            self.moves += 1
+            self._push(Delta(changed, array("b", [value]), counters, board))
+        return changed
+
+    # --- undo / redo ---
+
+    def can_undo(self):
+        return bool(self.history)
+
+    def can_redo(self):
+        return bool(self.future)
+
+    def undo(self):
+        """ 直前の手を取り消し、変化したマスの添字のリストを返す """
+        if not self.history: return []
+        delta = self.history.pop()
+        self._swap(delta)
+        self.future.append(delta)
+        return list(delta.indices)
+
+    def redo(self):
+        """ 取り消した手をやり直し、変化したマスの添字のリストを返す """
+        if not self.future: return []
+        delta = self.future.pop()
+        self._swap(delta)
+        self.history.append(delta)
+        return list(delta.indices)
+
+    def _counters(self):
+        board = self.board
+        if board is None: return (0, 0, self.state, self.moves)
+        return (board.opened, board.flags, self.state, self.moves)
+
+    def _push(self, delta):
+        self.history.append(delta)
+        self.future.clear()
+
+    def _swap(self, delta):
+        # 盤面を作った手なら、盤面ごと差分と入れ替える (取り消すと盤面は None に戻る)
+        board = self.board if self.board is not None else delta.board
+        display, values = board.display, delta.values
+        for k, i in enumerate(delta.indices):
+            display[i], values[k] = values[k], display[i]
+        counters = (board.opened, board.flags, self.state, self.moves)
+        board.opened, board.flags, self.state, self.moves = delta.counters
+        delta.counters = counters
+        self.board, delta.board = delta.board, self.board
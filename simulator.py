@@ -0,0 +1,212 @@
+# simulator.py
+# 画面を使わずに大量のゲームを自動で遊ばせて、勝率などを集計する
+#
+#   python simulator.py --size 16 --mines 40 --games 10000 --strategy deduction
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from session import GameSession
+from solver import Solver
+import consts as c
+
+# ==========================================
+#  戦略 (次の一手を決める)
+# ==========================================
+
+class RandomStrategy:
+    """ まだ開いていないマスをランダムに開く """
+
+    def reset(self):
+        pass
+
+    def observe(self, session, changed):
+        pass
+
+    def next_move(self, session, rng):
+        return "open", *_random_unopened(session, rng)
+
+
+class DeductionStrategy:
+    """ 数字 1 つだけから確定するマスを開く/旗を立てる。確定しなければランダム """
+
+    def __init__(self):
+        self.pending = []
+
+    def reset(self):
+        self.pending = []
+
+    def observe(self, session, changed):
+        pass
+
+    def next_move(self, session, rng):
+        board = session.board
+        if board is None:
+            # 最初の 1 手は盤面の中央 (周りが必ず安全なので連鎖しやすい)
+            return "open", session.size // 2, session.size // 2
+
+        while True:
+            while self.pending:
+                action, i = self.pending.pop()
+                if board.display[i] == c.UNOPENED:
+                    return (action, *board.coords(i))
+            if not self._deduce(board): break
+        return "open", *_random_unopened(session, rng)
+
+    def _deduce(self, board):
+        """ 盤面全体から確定手を集めて pending に積む。見つかれば True """
+        display = board.display
+        UNOPENED, FLAGGED = c.UNOPENED, c.FLAGGED
+        found = {}  # 順序を保つため dict を集合代わりに使う
+        for i in range(len(display)):
+            n = display[i]
+            if n <= 0: continue
+            unopened = []
+            flags = 0
+            for d in board.neighbors:
+                v = display[i + d]
+                if v == UNOPENED:
+                    unopened.append(i + d)
+                elif v == FLAGGED:
+                    flags += 1
+            if not unopened: continue
+            if n == flags:
+                found.update(dict.fromkeys(("open", j) for j in unopened))
+            elif n - flags == len(unopened):
+                found.update(dict.fromkeys(("flag", j) for j in unopened))
+        self.pending.extend(found)
+        return bool(found)
+
+
+class SolverStrategy:
+    """ solver.Solver (包含の規則まで使う) で安全と分かったマスだけを開く。無ければランダム """
+
+    def __init__(self):
+        self.solver = None
+
+    def reset(self):
+        self.solver = None
+
+    def observe(self, session, changed):
+        if session.board is None: return
+        if self.solver is None:
+            self.solver = Solver(session.board)
+        else:
+            self.solver.update(changed)
+
+    def next_move(self, session, rng):
+        if session.board is None:
+            return "open", session.size // 2, session.size // 2
+        if self.solver.safe:
+            return "open", *session.board.coords(min(self.solver.safe))
+        return "open", *_random_unopened(session, rng)
+
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "deduction": DeductionStrategy,
+    "solver": SolverStrategy,
+}
+
+def _random_unopened(session, rng):
+    size = session.size
+    # ほとんどの局面では数回引けば未オープンのマスに当たる
+    for _ in range(32):
+        r, col = rng.randrange(size), rng.randrange(size)
+        if session.get(r, col) == c.UNOPENED:
+            return r, col
+    cells = [(r, col) for r in range(size) for col in range(size)
+             if session.get(r, col) == c.UNOPENED]
+    return rng.choice(cells)
+
+# ==========================================
+#  対局と並列実行
+# ==========================================
+
+def play_game(size, num_mines, strategy, seed):
+    """ 1 ゲーム遊んで (勝ったか, クリック数) を返す """
+    rng = random.Random(seed)
+    session = GameSession(size, num_mines, seed)
+    strategy.reset()
+    clicks = 0
+    while not session.is_over():
+        action, r, col = strategy.next_move(session, rng)
+        if action == "open":
+            changed = session.open(r, col)
+        else:
+            changed = session.toggle_flag(r, col)
+        strategy.observe(session, changed)
+        clicks += 1
+    return session.state == c.WON, clicks
+
+def run_chunk(size, num_mines, strategy_name, seed, first, games):
+    """ ワーカープロセスで first 番目から games 回遊ぶ
+
+    各ゲームの乱数は (seed, 通し番号) だけで決まるので、
+    ワーカー数や分け方を変えても同じ結果になる。
+    """
+    strategy = STRATEGIES[strategy_name]()
+    wins = clicks = 0
+    for g in range(first, first + games):
+        won, n = play_game(size, num_mines, strategy, seed * 1000003 + g)
+        wins += won
+        clicks += n
+    return wins, clicks
+
+def simulate(size, num_mines, games, strategy_name="random", jobs=None, seed=0, chunk_size=None):
+    """ games 回のゲームをプロセスプールに分配し、集計結果を dict で返す """
+    jobs = jobs or os.cpu_count() or 1
+    # ワーカー数より十分多く分けておくと、速いワーカーが遊ばずに済む
+    chunk_size = chunk_size or max(1, min(1000, games // (jobs * 4)))
+    chunks = []
+    remaining = games
+    while remaining > 0:
+        chunks.append(min(chunk_size, remaining))
+        remaining -= chunks[-1]
+
+    start = time.perf_counter()
+    wins = clicks = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        first = 0
+        for n in chunks:
+            futures.append(pool.submit(run_chunk, size, num_mines, strategy_name, seed, first, n))
+            first += n
+        for f in futures:
+            w, n = f.result()
+            wins += w
+            clicks += n
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "clicks_per_game": clicks / games if games else 0.0,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed if elapsed > 0 else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minesweeper self-play simulator")
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="random")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=None, help="games per task sent to a worker")
+    args = parser.parse_args(argv)
+
+    result = simulate(args.size, args.mines, args.games, args.strategy,
+                      args.jobs, args.seed, args.chunk_size)
+    print(f"{args.size}x{args.size}, {args.mines} mines, strategy={args.strategy}")
+    print(f"games:       {result['games']}")
+    print(f"win rate:    {result['win_rate'] * 100:.2f}%")
+    print(f"clicks/game: {result['clicks_per_game']:.1f}")
+    print(f"games/sec:   {result['games_per_sec']:.1f} ({result['seconds']:.2f}s)")
+
+if __name__ == "__main__":
+    main()
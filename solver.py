@@ -0,0 +1,111 @@
+# solver.py
+# 表示されている数字から、確実に安全なマスと確実に地雷のマスを導く
+import consts as c
+
+class Solver:
+    """ logic.Board の display を読んで確定マスを求める (盤面自体は変更しない)
+
+    開いた数字マスごとに「周りの未確定マス U の中に地雷がちょうど k 個」という
+    制約を持ち、マスが開いたり確定したりするたびに関係する制約だけを見直す。
+    使う規則は次の 2 つ:
+      - 単独: k == 0 なら U は全部安全、k == len(U) なら全部地雷
+      - 包含: U_a ⊆ U_b なら U_b - U_a に地雷がちょうど k_b - k_a 個
+
+    確定したマスは safe / mines (盤面の添字の集合) に入る。
+    safe のマスは開かれた時点で取り除かれる。
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.safe = set()
+        self.mines = set()
+        self.constraints = {}   # 数字マスの添字 -> [未確定マスの集合, 残り地雷数]
+        self.cell_constraints = {}  # 未確定マスの添字 -> それを含む制約の集合
+        self.queue = set()      # 見直しが必要な制約
+        display = board.display
+        self.update(i for i in range(len(display)) if display[i] >= 0)
+
+    def update(self, changed):
+        """ 新しく開いたマス (open_cell の revealed など) を取り込み、確定マスを増やす """
+        display = self.board.display
+        opened = []
+        for i in changed:
+            if display[i] < 0: continue   # 旗・地雷・番兵は制約にならない
+            # 開いたマスは安全だと分かったことになる
+            self._resolve(i, False)
+            self.safe.discard(i)
+            opened.append(i)
+        for i in opened:
+            self._add_constraint(i)
+        self._propagate()
+
+    def _add_constraint(self, i):
+        display = self.board.display
+        unknown = set()
+        k = display[i]
+        for d in self.board.neighbors:
+            j = i + d
+            if j in self.mines:
+                k -= 1
+            elif j not in self.safe and display[j] in (c.UNOPENED, c.FLAGGED):
+                unknown.add(j)
+        if not unknown: return
+        self.constraints[i] = [unknown, k]
+        for j in unknown:
+            self.cell_constraints.setdefault(j, set()).add(i)
+        self.queue.add(i)
+
+    def _resolve(self, j, is_mine):
+        """ マス j が地雷/安全だと確定したので、j を含む制約から取り除く """
+        if is_mine:
+            if j in self.mines: return
+            self.mines.add(j)
+        elif self.board.display[j] in (c.UNOPENED, c.FLAGGED):
+            if j in self.safe: return
+            self.safe.add(j)
+        for a in self.cell_constraints.pop(j, ()):
+            con = self.constraints.get(a)
+            if con is None: continue
+            con[0].discard(j)
+            if is_mine: con[1] -= 1
+            self.queue.add(a)
+
+    def _propagate(self):
+        constraints = self.constraints
+        while self.queue:
+            a = self.queue.pop()
+            con = constraints.get(a)
+            if con is None: continue
+            unknown, k = con
+            if not unknown:
+                del constraints[a]
+                continue
+
+            # 単独の規則
+            if k == 0 or k == len(unknown):
+                del constraints[a]
+                for j in list(unknown):
+                    self._resolve(j, k > 0)
+                continue
+
+            # 包含の規則: 未確定マスを共有する制約とだけ比べる
+            others = set()
+            for j in unknown:
+                others.update(self.cell_constraints.get(j, ()))
+            others.discard(a)
+            for b in others:
+                con_b = constraints.get(b)
+                if con_b is None: continue
+                unknown_b, k_b = con_b
+                if unknown <= unknown_b:
+                    rest, k_rest = unknown_b - unknown, k_b - k
+                elif unknown_b <= unknown:
+                    rest, k_rest = unknown - unknown_b, k - k_b
+                else:
+                    continue
+                if rest and (k_rest == 0 or k_rest == len(rest)):
+                    for j in rest:
+                        self._resolve(j, k_rest > 0)
+                    # 制約が変わったので a は後でもう一度見る
+                    self.queue.add(a)
+                    break
@@ -0,0 +1,5 @@
+# モジュールはリポジトリ直下にあるので、テストから import できるようにする
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import random
+from itertools import combinations
+
+import pytest
+
+import logic
+import probability
+import consts as c
+
+def brute_force(board):
+    """ 表示と矛盾しない地雷の置き方を全部数えて、マスごとの確率を求める """
+    display = board.display
+    unknown = [i for i in range(len(display)) if display[i] in (c.UNOPENED, c.FLAGGED)]
+    numbers = [(i, display[i]) for i in range(len(display)) if display[i] > 0]
+    hits = dict.fromkeys(unknown, 0)
+    total = 0
+    for mines in combinations(unknown, board.num_mines):
+        mines = set(mines)
+        if all(sum(i + d in mines for d in board.neighbors) == v for i, v in numbers):
+            total += 1
+            for i in mines:
+                hits[i] += 1
+    return {i: n / total for i, n in hits.items()}
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    board = logic.initialize_board(5, 5, 0, 0, seed)
+    board.open_cell(0, 0)
+    # 地雷でないマスをいくつか開き、旗も立てておく (旗のマスも確率を持つ)
+    for _ in range(rng.randrange(4)):
+        r, col = rng.randrange(5), rng.randrange(5)
+        if not board.is_mine(r, col): board.open_cell(r, col)
+    r, col = rng.randrange(5), rng.randrange(5)
+    board.toggle_flag(r, col)
+
+    probs = probability.mine_probabilities(board)
+    expected = brute_force(board)
+    assert probs.keys() == expected.keys()
+    for i, p in expected.items():
+        assert probs[i] == pytest.approx(p)
@@ -0,0 +1,51 @@
+import random
+
+import logic
+import replay
+from session import GameSession
+
+class StubPool:
+    """ 決まった seed の盤面を順に渡し、無くなったら None (作り置き切れ) """
+
+    def __init__(self, seeds):
+        self.seeds = list(seeds)
+
+    def take(self, size, num_mines, r, col):
+        if not self.seeds: return None
+        return logic.initialize_board(size, num_mines, r, col, self.seeds.pop(0))
+
+def record(path, session, moves):
+    rec = replay.Recorder(path, session)
+    for action, r, col in moves:
+        if action == replay.OPEN: session.open(r, col)
+        elif action == replay.FLAG: session.toggle_flag(r, col)
+        elif action == replay.CHORD: session.chord(r, col)
+        elif action == replay.UNDO: session.undo()
+        elif action == replay.REDO: session.redo()
+        rec.record(action, r, col)
+    rec.close()
+
+def test_undo_after_pooled_first_move(tmp_path):
+    path = tmp_path / "game.msr"
+    session = GameSession(9, 10, seed=1, pool=StubPool([99]))
+    # 作り置きの盤面で始めて undo し、作り置きが切れた状態で開き直す
+    record(path, session, [(replay.OPEN, 0, 0), (replay.UNDO, 0, 0), (replay.OPEN, 0, 0)])
+    assert not session.pooled
+
+    replayed = replay.replay(path)
+    assert replayed.moves == session.moves
+    assert replay.display_crc(replayed.board) == replay.display_crc(session.board)
+
+def test_random_games_with_pool_replay_exactly(tmp_path):
+    path = tmp_path / "game.msr"
+    actions = [replay.OPEN] * 4 + [replay.FLAG, replay.CHORD, replay.UNDO, replay.REDO]
+    for seed in range(40):
+        rng = random.Random(seed)
+        session = GameSession(8, 8, seed=seed, pool=StubPool(range(1000 + seed, 1003 + seed)))
+        moves = [(rng.choice(actions), rng.randrange(8), rng.randrange(8)) for _ in range(40)]
+        record(path, session, moves)
+
+        replayed = replay.replay(path)
+        assert replayed.state == session.state
+        assert replayed.moves == session.moves
+        assert replay.display_crc(replayed.board) == replay.display_crc(session.board)
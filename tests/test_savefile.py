@@ -0,0 +1,73 @@
+import pytest
+
+import savefile
+import consts as c
+from session import GameSession
+
+def assert_same(loaded, session):
+    assert (loaded.size, loaded.num_mines, loaded.seed) == (session.size, session.num_mines, session.seed)
+    assert loaded.state == session.state
+    assert loaded.moves == session.moves
+    if session.board is None:
+        assert loaded.board is None
+        return
+    board, other = session.board, loaded.board
+    assert other.display == board.display
+    assert other.cells == board.cells
+    assert (other.opened, other.flags) == (board.opened, board.flags)
+
+def first_mine(board):
+    return next((r, col) for r in range(board.size) for col in range(board.size)
+                if board.is_mine(r, col))
+
+def test_session_without_board():
+    session = GameSession(9, 10, seed=3)
+    assert_same(savefile.loads(savefile.dumps(session)), session)
+
+def test_game_in_progress_with_flags():
+    session = GameSession(16, 40, seed=7)
+    session.open(8, 8)
+    r, col = first_mine(session.board)
+    session.toggle_flag(r, col)
+    session.toggle_flag(0, 15)
+    assert session.state == c.PLAYING and session.board.flags > 0
+
+    loaded = savefile.loads(savefile.dumps(session))
+    assert_same(loaded, session)
+    # 読み込んだ盤面でそのまま続けられる
+    loaded.open(15, 0)
+    session.open(15, 0)
+    assert_same(loaded, session)
+
+def test_lost_game_with_mines_shown():
+    session = GameSession(16, 40, seed=11)
+    session.open(0, 0)
+    session.open(*first_mine(session.board))
+    assert session.state == c.LOST
+    assert (c.MINE & 0xff) in session.board.display.tobytes()
+    assert_same(savefile.loads(savefile.dumps(session)), session)
+
+@pytest.mark.parametrize("size", [5, 7, 9, 13])
+def test_area_not_multiple_of_8(size):
+    # 面積が奇数 (4 ビットの詰め合わせ) で 8 の倍数でもない (地雷のビット列) 大きさ
+    session = GameSession(size, size, seed=size)
+    session.open(size // 2, size // 2)
+    assert_same(savefile.loads(savefile.dumps(session)), session)
+
+def test_truncated_header():
+    data = savefile.dumps(GameSession(9, 10, seed=1))
+    with pytest.raises(ValueError):
+        savefile.loads(data[:10])
+
+def test_truncated_body():
+    session = GameSession(9, 10, seed=1)
+    session.open(4, 4)
+    data = savefile.dumps(session)
+    with pytest.raises(ValueError):
+        savefile.loads(data[:-5])
+
+def test_invalid_state():
+    data = bytearray(savefile.dumps(GameSession(9, 10, seed=1)))
+    data[5] |= 3 << 1
+    with pytest.raises(ValueError):
+        savefile.loads(bytes(data))
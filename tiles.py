@@ -0,0 +1,103 @@
+# tiles.py
+# 盤面を 1 枚の画像 (graphics.Image) に描く描画方式
+#
+# マス 1 つごとに Rectangle や Text を作ると、200x200 の盤面で 4 万個以上の
+# Tk のアイテムになる。ここではマスの見た目 (タイル) を値ごとに 1 度だけ作っておき、
+# 盤面の画像の該当する場所へ写すだけにする。キャンバスのアイテムは盤面の大きさに
+# よらず 1 個で、描き直すのは値が変わったマスだけ。
+from array import array
+
+from graphics import Image, Point
+import consts as c
+
+# 5x7 のビットマップ文字 (数字と旗の "F")
+GLYPHS = {
+    1: ("..#..", ".##..", "..#..", "..#..", "..#..", "..#..", ".###."),
+    2: (".###.", "#...#", "....#", "...#.", "..#..", ".#...", "#####"),
+    3: ("####.", "....#", "....#", ".###.", "....#", "....#", "####."),
+    4: ("...#.", "..##.", ".#.#.", "#..#.", "#####", "...#.", "...#."),
+    5: ("#####", "#....", "####.", "....#", "....#", "#...#", ".###."),
+    6: ("..##.", ".#...", "#....", "####.", "#...#", "#...#", ".###."),
+    7: ("#####", "....#", "...#.", "..#..", ".#...", ".#...", ".#..."),
+    8: (".###.", "#...#", "#...#", ".###.", "#...#", "#...#", ".###."),
+    c.FLAGGED: ("#####", "#....", "#....", "####.", "#....", "#....", "#...."),
+}
+
+def make_tile(val, cell=c.CELL_SIZE):
+    """ 表示の値 val のマスの見た目 (cell x cell の画像) を作る """
+    if val == c.MINE:
+        bg = c.COLOR_MINE
+    elif val in (c.UNOPENED, c.FLAGGED):
+        bg = c.COLOR_UNOPENED
+    else:
+        bg = c.COLOR_OPENED
+    tile = Image(Point(0, 0), cell, cell)
+    # 枠 (Rectangle の outline と同じ灰色) と中身
+    tile.fillRect(0, 0, cell, cell, "gray")
+    tile.fillRect(1, 1, cell - 1, cell - 1, bg)
+
+    glyph = GLYPHS.get(val)
+    if glyph is not None:
+        color = c.COLOR_FLAG if val == c.FLAGGED else c.COLOR_TEXT
+        scale = max(1, cell // 10)
+        x0 = (cell - 5 * scale) // 2
+        y0 = (cell - 7 * scale) // 2
+        for gy, line in enumerate(glyph):
+            for gx, ch in enumerate(line):
+                if ch == "#":
+                    x, y = x0 + gx * scale, y0 + gy * scale
+                    tile.fillRect(x, y, x + scale, y + scale, color)
+    return tile
+
+class TileRenderer:
+    """ size x size マスを、左上が (x, y) の 1 枚の画像として win に描く
+
+    盤面の一部だけを出すとき (view.MinesweeperView のスクロール) は、
+    size は画面に見えているマスの数で、update には画面上の位置を渡す。
+    """
+
+    def __init__(self, win, size, x, y, cell=c.CELL_SIZE):
+        self.size = size
+        self.cell = cell
+        self.tiles = {v: make_tile(v, cell) for v in (c.UNOPENED, c.FLAGGED, c.MINE, *range(9))}
+        width = size * cell
+        self.image = Image(Point(x + width / 2, y + width / 2), width, width)
+        self.shown = array("b", [c.UNOPENED]) * (size * size)   # いま画像に描いてある値
+        self._fill(self.tiles[c.UNOPENED])
+        self.image.draw(win)
+
+    def _fill(self, tile):
+        # 全マスを同じタイルで埋める。描いた範囲を倍々に写すので Tk の呼び出しは O(log size) 回
+        image, cell = self.image, self.cell
+        width = self.size * cell
+        image.copyFrom(tile, 0, 0)
+        done = cell
+        while done < width:
+            n = min(done, width - done)
+            image.copyFrom(image, done, 0, (0, 0, n, cell))
+            done += n
+        done = cell
+        while done < width:
+            n = min(done, width - done)
+            image.copyFrom(image, 0, done, (0, 0, width, n))
+            done += n
+
+    def update(self, r, col, val):
+        """ (r, col) のマスを val の見た目にする (変わっていなければ何もしない) """
+        k = r * self.size + col
+        if self.shown[k] == val: return
+        self.shown[k] = val
+        self.image.copyFrom(self.tiles[val], col * self.cell, r * self.cell)
+
+    def refresh(self, board, top=0, left=0):
+        """ board (logic.Board) の (top, left) から size x size の範囲と違うマスだけを描き直す
+
+        行ごとに array の比較 (C で動く) で違いを探すので、変化の無い行はほぼ素通りする。
+        """
+        size, shown, display = self.size, self.shown, board.display
+        for r in range(size):
+            start = board.index(top + r, left)
+            row = display[start:start + size]
+            if row == shown[r * size:(r + 1) * size]: continue
+            for col in range(size):
+                self.update(r, col, row[col])
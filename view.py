@@ -1,25 +1,45 @@
 # view.py
+from array import array
 from graphics import *
 import consts as c
 
+# スクロールに使うキーと、動かすマスの数 (行, 列)。None は 1 画面分
+PAN_KEYS = {
+    "Up": (-1, 0), "Down": (1, 0), "Left": (0, -1), "Right": (0, 1),
+    "Prior": (None, 0), "Next": (None, 0),
+}
+
 class MinesweeperView:
-    def __init__(self, size, num_mines):
+    def __init__(self, size, num_mines, tiles=None):
         self.size = size
         self.num_mines = num_mines
+        # 大きな盤面はマスごとの図形ではなく 1 枚の画像に描く (tiles=True/False で指定もできる)
+        self.use_tiles = size >= c.TILE_MIN_SIZE if tiles is None else tiles
+        self.renderer = None
         self.control_height = 60
+
+        # 画面に出すのは view_size x view_size マスだけ。(top, left) が左上に来るマス
+        # マスの図形 (または画像のタイル) は画面上の位置ごとに持ち、スクロールしたら中身だけ描き直す
+        self.view_size = min(size, c.VIEWPORT_CELLS)
+        self.top = 0
+        self.left = 0
+        self.board = None    # 最後に描いた盤面 (スクロールで描き直すのに使う)
+        self.shown = array("b", [c.UNOPENED]) * (self.view_size * self.view_size)
+        self.key_handler = None
         
         # ウィンドウ幅計算
-        board_pixel_width = size * c.CELL_SIZE
+        board_pixel_width = self.view_size * c.CELL_SIZE
         self.window_width = max(board_pixel_width, 350)
         
         # ★修正: ウィンドウの高さにヘッダー分を追加
-        self.window_height = c.HEADER_HEIGHT + size * c.CELL_SIZE + self.control_height
+        self.window_height = c.HEADER_HEIGHT + board_pixel_width + self.control_height
         
         # 中央寄せオフセット
         self.offset_x = (self.window_width - board_pixel_width) / 2
         
         self.win = GraphWin("Minesweeper", self.window_width, self.window_height)
         self.win.setBackground(c.COLOR_BG)
+        self.win.setKeyHandler(self._on_key)
         
         self.rects = []
         self.flag_icons = {}
@@ -34,60 +54,65 @@ class MinesweeperView:
         self.remain_text = None
         
         self._init_gui()
-        self.display_remaining_mines([], self.num_mines)
+        self.display_remaining_mines(None, self.num_mines)
 
     def _init_gui(self):
-        # ★追加: 上部のヘッダーエリア（メッセージ表示用）
-        header_bg = Rectangle(Point(0, 0), Point(self.window_width, c.HEADER_HEIGHT))
-        header_bg.setFill("white")
-        header_bg.setOutline("gray")
-        header_bg.draw(self.win)
-        
-        # ヘッダーテキスト（初期は空）
-        self.header_text = Text(Point(self.window_width/2, c.HEADER_HEIGHT/2), "")
-        self.header_text.setSize(c.FONT_SIZE_HEADER)
-        self.header_text.setStyle("bold")
-        self.header_text.draw(self.win)
-
-        # 盤面の描画
-        for r in range(self.size):
-            row_rects = []
-            for col in range(self.size):
-                x1 = self.offset_x + col * c.CELL_SIZE
-                # ★修正: Y座標に HEADER_HEIGHT を足して下にずらす
-                y1 = c.HEADER_HEIGHT + r * c.CELL_SIZE
-                x2 = self.offset_x + (col + 1) * c.CELL_SIZE
-                y2 = c.HEADER_HEIGHT + (r + 1) * c.CELL_SIZE
+        with self.win.batch():
+            # ★追加: 上部のヘッダーエリア（メッセージ表示用）
+            header_bg = Rectangle(Point(0, 0), Point(self.window_width, c.HEADER_HEIGHT))
+            header_bg.setFill("white")
+            header_bg.setOutline("gray")
+            header_bg.draw(self.win)
+        
+            # ヘッダーテキスト（初期は空）
+            self.header_text = Text(Point(self.window_width/2, c.HEADER_HEIGHT/2), "")
+            self.header_text.setSize(c.FONT_SIZE_HEADER)
+            self.header_text.setStyle("bold")
+            self.header_text.draw(self.win)
+
+            # 盤面の描画
+            if self.use_tiles:
+                from tiles import TileRenderer
+                self.renderer = TileRenderer(self.win, self.view_size, self.offset_x, c.HEADER_HEIGHT)
+            else:
+                for r in range(self.view_size):
+                    row_rects = []
+                    for col in range(self.view_size):
+                        x1 = self.offset_x + col * c.CELL_SIZE
+                        # ★修正: Y座標に HEADER_HEIGHT を足して下にずらす
+                        y1 = c.HEADER_HEIGHT + r * c.CELL_SIZE
+                        x2 = self.offset_x + (col + 1) * c.CELL_SIZE
+                        y2 = c.HEADER_HEIGHT + (r + 1) * c.CELL_SIZE
                 
-                rect = Rectangle(Point(x1, y1), Point(x2, y2))
-                rect.setFill(c.COLOR_UNOPENED)
-                rect.setOutline("gray")
-                rect.draw(self.win)
-                row_rects.append(rect)
-            self.rects.append(row_rects)
+                        rect = Rectangle(Point(x1, y1), Point(x2, y2))
+                        rect.setFill(c.COLOR_UNOPENED)
+                        rect.setOutline("gray")
+                        rect.draw(self.win)
+                        row_rects.append(rect)
+                    self.rects.append(row_rects)
             
-        # コントロールエリア背景
-        # ★修正: 開始位置をずらす
-        y_start = c.HEADER_HEIGHT + self.size * c.CELL_SIZE
-        bg = Rectangle(Point(0, y_start), Point(self.window_width, self.window_height))
-        bg.setFill("white")
-        bg.draw(self.win)
-        
-        # モード切替ボタン
-        self.btn_area = Rectangle(Point(5, y_start+10), Point(140, y_start+50))
-        self.btn_area.setFill(c.COLOR_BTN_OPEN)
-        self.btn_area.setOutline("black")
-        self.btn_area.draw(self.win)
-        
-        self.btn_label = Text(Point(72.5, y_start+30), "⛏️ MODE: OPEN")
-        self.btn_label.setStyle("bold")
-        self.btn_label.draw(self.win)
-        
-        # メッセージエリア（下部）- 必要なら残すが、今回は上部メインにするので空でもOK
-        space_center_x = (140 + (self.window_width - 110)) / 2
-        self.msg_text = Text(Point(space_center_x, y_start+30), "")
-        self.msg_text.setSize(10)
-        self.msg_text.draw(self.win)
+            # コントロールエリア背景
+            # ★修正: 開始位置をずらす
+            y_start = c.HEADER_HEIGHT + self.view_size * c.CELL_SIZE
+            bg = Rectangle(Point(0, y_start), Point(self.window_width, self.window_height))
+            bg.setFill("white")
+            bg.draw(self.win)
+        
+            # モード切替ボタン
+            self.btn_area = Rectangle(Point(5, y_start+10), Point(140, y_start+50))
+            self.btn_area.setFill(c.COLOR_BTN_OPEN)
+            self.btn_area.setOutline("black")
+            self.btn_area.draw(self.win)
+        
+            self.btn_label = Text(Point(72.5, y_start+30), "⛏️ MODE: OPEN")
+            self.btn_label.setStyle("bold")
+            self.btn_label.draw(self.win)
+        
+            # メッセージエリア（下部）- 必要なら残すが、今回は上部メインにするので空でもOK
+            space_center_x = (140 + (self.window_width - 110)) / 2
+            self.msg_text = Text(Point(space_center_x, y_start+30), "")
+            self.msg_text.setSize(10)
+            self.msg_text.draw(self.win)
 
     def update_mode_button(self, is_open_mode):
         if is_open_mode:
@@ -107,15 +132,19 @@ class MinesweeperView:
             self.header_text.setText(text)
             self.header_text.setTextColor(color)
 
-    def display_remaining_mines(self, display, num_mines):
-        if not display:
+    def clear_messages(self):
+        self.header_text.setText("")
+        self.msg_text.setText("")
+
+    def display_remaining_mines(self, board, num_mines):
+        if board is None:
             remain = num_mines
         else:
-            remain = self._remainMines(display, num_mines)
+            remain = self._remainMines(board, num_mines)
         
         text_str = f"Mines: {remain}"
         # ★修正: Y座標計算に HEADER_HEIGHT を足す
-        y_start = c.HEADER_HEIGHT + self.size * c.CELL_SIZE
+        y_start = c.HEADER_HEIGHT + self.view_size * c.CELL_SIZE
         
         bg_p1 = Point(self.window_width - 110, y_start + 15)
         bg_p2 = Point(self.window_width - 10, y_start + 45)
@@ -135,50 +164,123 @@ class MinesweeperView:
         else:
             self.remain_text.setText(text_str)
 
-    def _remainMines(self, display, num_mines):
-        flagged_count = sum(row.count(c.FLAGGED) for row in display)
-        return num_mines - flagged_count
-
-    def refresh_board(self, display):
-        for r in range(self.size):
-            for col in range(self.size):
-                val = display[r][col]
-                rect = self.rects[r][col]
-                key = (r, col)
-                # ★修正: Rectから中心座標を取得する（Rect自体がずれているので再計算不要）
-                cx, cy = rect.p1.getX() + c.CELL_SIZE/2, rect.p1.getY() + c.CELL_SIZE/2
-
-                if val == c.FLAGGED:
-                    if key not in self.flag_icons:
-                        ft = Text(Point(cx, cy), "F")
-                        ft.setFill(c.COLOR_FLAG)
-                        ft.setStyle("bold")
-                        ft.draw(self.win)
-                        self.flag_icons[key] = ft
-                    continue
-
-                if key in self.flag_icons:
-                    self.flag_icons[key].undraw()
-                    del self.flag_icons[key]
-                
-                if val != c.UNOPENED:
-                    rect.setFill(c.COLOR_OPENED)
-                    if val == c.MINE:
-                        rect.setFill(c.COLOR_MINE)
-                    elif val > 0:
-                        if key not in self.text_objects:
-                            t = Text(Point(cx, cy), str(val))
-                            t.setFill(c.COLOR_TEXT)
-                            t.draw(self.win)
-                            self.text_objects[key] = t
-        
-        self.display_remaining_mines(display, self.num_mines)
-
-    def get_click(self):
-        try:
-            return self.win.getMouse()
-        except GraphicsError:
-            return None
+    def _remainMines(self, board, num_mines):
+        return board.remaining_mines()
+
+    def refresh_board(self, board, changed=None):
+        """ 盤面の表示を更新する
+        
+        changed に変化したマスの添字 (open_cell の revealed など) を渡すと、
+        そのマスだけを描き直す。省略すると画面に見えているマスを全部見直す。
+        """
+        self.board = board
+        with self.win.batch():
+            if changed is None or len(changed) > len(self.shown):
+                # 大きな連鎖は、見えている範囲を見直す方が速い
+                self._refresh_visible(board)
+            else:
+                for i in changed:
+                    r, col = board.coords(i)
+                    self._update_cell(r, col, board.display[i])
+            
+            self.display_remaining_mines(board, self.num_mines)
+
+    def _refresh_visible(self, board):
+        if self.renderer is not None:
+            self.renderer.refresh(board, self.top, self.left)
+            return
+        for r in range(self.top, self.top + self.view_size):
+            for col in range(self.left, self.left + self.view_size):
+                self._update_cell(r, col, board.get(r, col))
+
+    def scroll(self, dr, dc):
+        """ 表示する範囲を dr 行, dc 列ずらす (盤面の端で止まる) """
+        limit = self.size - self.view_size
+        top = min(max(self.top + dr, 0), limit)
+        left = min(max(self.left + dc, 0), limit)
+        if (top, left) == (self.top, self.left): return
+        self.top, self.left = top, left
+        # 盤面ができる前は全部未オープンなので描き直すものは無い
+        if self.board is not None:
+            with self.win.batch():
+                self._refresh_visible(self.board)
+
+    def _on_key(self, key):
+        # 矢印キーと PageUp/PageDown はスクロール、それ以外は set_key_handler の handler へ
+        if key in PAN_KEYS:
+            dr, dc = PAN_KEYS[key]
+            if dr is None:
+                dr = self.view_size - 1 if key == "Next" else 1 - self.view_size
+            self.scroll(dr, dc)
+        elif self.key_handler is not None:
+            self.key_handler(key)
+
+    def _update_cell(self, r, col, val):
+        # 盤面の (r, col) を画面上の位置に直す。見えていなければ描かない
+        r -= self.top
+        col -= self.left
+        if not (0 <= r < self.view_size and 0 <= col < self.view_size): return
+        if self.renderer is not None:
+            self.renderer.update(r, col, val)
+            return
+        slot = r * self.view_size + col
+        if self.shown[slot] == val: return
+        self.shown[slot] = val
+
+        rect = self.rects[r][col]
+        key = (r, col)
+        # ★修正: Rectから中心座標を取得する（Rect自体がずれているので再計算不要）
+        cx, cy = rect.p1.getX() + c.CELL_SIZE/2, rect.p1.getY() + c.CELL_SIZE/2
+
+        # 図形は作り直さず、色と文字だけ変える (スクロールすると別のマスの値が来る)
+        if val == c.MINE:
+            rect.setFill(c.COLOR_MINE)
+        elif val in (c.UNOPENED, c.FLAGGED):
+            rect.setFill(c.COLOR_UNOPENED)
+        else:
+            rect.setFill(c.COLOR_OPENED)
+
+        if val == c.FLAGGED:
+            if key not in self.flag_icons:
+                ft = Text(Point(cx, cy), "F")
+                ft.setFill(c.COLOR_FLAG)
+                ft.setStyle("bold")
+                ft.draw(self.win)
+                self.flag_icons[key] = ft
+            self.flag_icons[key].setText("F")
+        elif key in self.flag_icons:
+            self.flag_icons[key].setText("")
+
+        if val > 0:
+            if key not in self.text_objects:
+                t = Text(Point(cx, cy), str(val))
+                t.setFill(c.COLOR_TEXT)
+                t.draw(self.win)
+                self.text_objects[key] = t
+            self.text_objects[key].setText(str(val))
+        elif key in self.text_objects:
+            self.text_objects[key].setText("")
+
+    def batch(self):
+        """ with の中の描画をまとめて 1 回で画面に反映する (graphics.GraphWin.batch) """
+        return self.win.batch()
+
+    def set_click_handler(self, handler):
+        """ クリックされたら handler(Point) がすぐに呼ばれるようにする """
+        self.win.setMouseHandler(handler)
+
+    def set_chord_handler(self, handler):
+        """ 中クリックかダブルクリックで handler(Point) が呼ばれるようにする """
+        self.win.bindMouse("<Button-2>", handler)
+        self.win.bindMouse("<Double-Button-1>", handler)
+
+    def set_key_handler(self, handler):
+        """ キーが押されたら handler(キー名) がすぐに呼ばれるようにする (スクロールのキー以外) """
+        self.key_handler = handler
+
+    def run(self):
+        """ ウィンドウが閉じられるまでイベントを処理する """
+        self.win.mainloop()
 
     def is_button_clicked(self, p):
         x, y = p.getX(), p.getY()
@@ -190,33 +292,39 @@ class MinesweeperView:
         
         # ★修正: Y座標の範囲判定に HEADER_HEIGHT を考慮
         board_top = c.HEADER_HEIGHT
-        board_bottom = c.HEADER_HEIGHT + self.size * c.CELL_SIZE
-        board_w = self.size * c.CELL_SIZE
+        board_bottom = c.HEADER_HEIGHT + self.view_size * c.CELL_SIZE
+        board_w = self.view_size * c.CELL_SIZE
 
         # 盤面エリア内かチェック
         if (board_top <= y < board_bottom) and (self.offset_x <= x < self.offset_x + board_w):
-            # ずらした分(offset_x と HEADER_HEIGHT)を引いてインデックス計算
-            return int((y - board_top) // c.CELL_SIZE), int((x - self.offset_x) // c.CELL_SIZE)
+            # ずらした分(offset_x と HEADER_HEIGHT)を引いてインデックス計算し、スクロール分を足す
+            return (self.top + int((y - board_top) // c.CELL_SIZE),
+                    self.left + int((x - self.offset_x) // c.CELL_SIZE))
         return None
 
     def close(self):
         self.win.close()
-    
-    def wait_click(self):
-        self.win.getMouse()
 
-# スタート画面 (変更なし)
-def show_start_screen():
+    def is_closed(self):
+        return self.win.isClosed()
+
+# スタート画面 (難易度は consts.DIFFICULTIES から。クリックはイベントで受け取る)
+def show_start_screen(no_guess=False, on_no_guess=None):
+    """ 難易度と「推測なし」を選ばせ、(サイズ, 地雷数, 推測なしか) を返す。閉じられたら None
+
+    on_no_guess を渡すと、最初と「推測なし」を切り替えるたびに on_no_guess(推測なしか) を呼ぶ。
+    """
     win = GraphWin("Minesweeper Menu", 400, 400)
     win.setBackground("lightblue")
     
     Text(Point(200, 80), "Minesweeper").draw(win).setSize(24)
     Text(Point(200, 120), "難易度を選んでください").draw(win)
     
+    beginner, intermediate, expert = c.DIFFICULTIES
     buttons = [
-        {"rect": [100, 160, 300, 200], "text": "初級 (9x9, 10個)", "val": (9, 10), "col": "lightgreen"},
-        {"rect": [100, 220, 300, 260], "text": "中級 (16x16, 40個)", "val": (16, 40), "col": "yellow"},
-        {"rect": [100, 280, 300, 320], "text": "上級 (20x20, 70個)", "val": (20, 70), "col": "orange"}
+        {"rect": [100, 160, 300, 200], "text": "初級 ({0}x{0}, {1}個)".format(*beginner), "val": beginner, "col": "lightgreen"},
+        {"rect": [100, 220, 300, 260], "text": "中級 ({0}x{0}, {1}個)".format(*intermediate), "val": intermediate, "col": "yellow"},
+        {"rect": [100, 280, 300, 320], "text": "上級 ({0}x{0}, {1}個)".format(*expert), "val": expert, "col": "orange"}
     ]
     
     for b in buttons:
@@ -225,15 +333,33 @@ def show_start_screen():
         r.draw(win)
         Text(Point(200, (b["rect"][1]+b["rect"][3])/2), b["text"]).draw(win)
 
+    # 「推測なし」の切り替え (押すたびに ON/OFF)
+    toggle = [100, 345, 300, 380]
+    toggle_bg = Rectangle(Point(toggle[0], toggle[1]), Point(toggle[2], toggle[3]))
+    toggle_bg.draw(win)
+    toggle_text = Text(Point(200, (toggle[1]+toggle[3])/2), "")
+    toggle_text.draw(win)
+    def show_no_guess():
+        toggle_bg.setFill("white" if no_guess else "lightgray")
+        toggle_text.setText("推測なしで解ける盤面: " + ("ON" if no_guess else "OFF"))
+        if on_no_guess is not None: on_no_guess(no_guess)
+    show_no_guess()
+
     choice = None
-    while choice is None:
-        try:
-            p = win.getMouse()
-            x, y = p.getX(), p.getY()
-            for b in buttons:
-                if b["rect"][0] <= x <= b["rect"][2] and b["rect"][1] <= y <= b["rect"][3]:
-                    choice = b["val"]
-        except GraphicsError:
-            return None
-    win.close()
-    return choice
\ No newline at end of file
+    def on_click(p):
+        nonlocal choice, no_guess
+        x, y = p.getX(), p.getY()
+        if toggle[0] <= x <= toggle[2] and toggle[1] <= y <= toggle[3]:
+            no_guess = not no_guess
+            show_no_guess()
+            return
+        for b in buttons:
+            if b["rect"][0] <= x <= b["rect"][2] and b["rect"][1] <= y <= b["rect"][3]:
+                choice = (*b["val"], no_guess)
+                win.close()
+                return
+
+    # ボタンが押されるかウィンドウが閉じられるまで待つ
+    win.setMouseHandler(on_click)
+    win.mainloop()
+    return choice